@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+# Sweep the number of hashes per anchor transaction (and entries per mapped anchor transaction) to find the batch
+# size with the best throughput per LTO spent.
+#
+# USAGE: python -m e2e.bench.anchor_sweep [--sizes 1,2,5,...] [--repeat N] [--key-type TYPE] [--json FILE]
+
+import argparse
+import json
+from time import monotonic
+from types import SimpleNamespace
+import requests
+
+from e2e.bench.stats import summary, ms, print_table, write_json
+from e2e.common.funding import fund_accounts
+from e2e.common.tools import URL, TRACKER, generate_account
+from e2e.steps.anchor import anchors_tx
+from e2e.steps.mapped_anchor import mapped_anchors_tx
+from lto.transactions import Anchor, MappedAnchor
+
+MAX_ENTRY_COUNT = 100  # AnchorTransaction.MaxEntryCount and MappedAnchorTransaction.MaxEntryCount
+
+KINDS = {
+    'anchor': (anchors_tx, Anchor),
+    'mapped_anchor': (mapped_anchors_tx, MappedAnchor),
+}
+
+
+def measure(context, session, kind, size, repeat):
+    builder, _ = KINDS[kind]
+    samples = []
+
+    for _ in range(repeat):
+        start = monotonic()
+        transaction = builder(context, 'sender', size)
+        sign = monotonic() - start
+
+        body = json.dumps(transaction.to_json())
+        start = monotonic()
+        response = session.post(URL + '/transactions/broadcast', data=body,
+                                headers={'content-type': 'application/json'})
+        broadcast = monotonic() - start
+
+        sample = {'sign': sign, 'broadcast': broadcast, 'json_bytes': len(body),
+                  'binary_bytes': len(transaction.to_binary()), 'accepted': response.status_code == 200}
+        if sample['accepted']:
+            sample['fee'] = response.json()['fee']
+            sample['future'] = TRACKER.watch(response.json()['id'])
+            sample['sent'] = start
+        samples.append(sample)
+
+    for sample in samples:
+        if sample['accepted']:
+            sample['future'].result()
+            sample['block'] = monotonic() - sample.pop('sent')
+            del sample['future']
+
+    accepted = [s for s in samples if s['accepted']]
+    fee = accepted[0]['fee'] if accepted else None
+
+    return {
+        'kind': kind,
+        'size': size,
+        'accepted': len(accepted),
+        'rejected': len(samples) - len(accepted),
+        'sign': summary([s['sign'] for s in samples]),
+        'broadcast': summary([s['broadcast'] for s in samples]),
+        'block': summary([s['block'] for s in accepted]),
+        'json_bytes': samples[0]['json_bytes'],
+        'binary_bytes': samples[0]['binary_bytes'],
+        'fee': fee,
+        'fee_per_hash': fee / size if fee else None,
+        'hashes_per_lto': size / (fee / 100000000) if fee else None,
+    }
+
+
+def main(sizes, repeat, key_type, kinds, json_file):
+    context = SimpleNamespace(users={'sender': generate_account(key_type)}, tx_ids=[])
+
+    total_fee = sum(KINDS[kind][1].BASE_FEE + KINDS[kind][1].VAR_FEE * size for kind in kinds for size in sizes)
+    fund_accounts(context, [{'recipient': context.users['sender'].address, 'amount': total_fee * repeat}])
+
+    session = requests.Session()
+    results = [measure(context, session, kind, size, repeat) for kind in kinds for size in sizes]
+
+    print_table(
+        ['kind', 'size', 'sign p50', 'bcast p50', 'block p50', 'block p90', 'json B', 'binary B', 'fee/hash',
+         'hashes/LTO', 'rejected'],
+        [
+            [r['kind'], r['size'], ms(r['sign']['p50']), ms(r['broadcast']['p50']), ms(r['block']['p50']),
+             ms(r['block']['p90']), r['json_bytes'], r['binary_bytes'],
+             '-' if r['fee_per_hash'] is None else '%.4f' % (r['fee_per_hash'] / 100000000),
+             '-' if r['hashes_per_lto'] is None else '%.2f' % r['hashes_per_lto'], r['rejected']]
+            for r in results
+        ]
+    )
+
+    if json_file:
+        write_json(json_file, {'key_type': key_type, 'repeat': repeat, 'results': results})
+
+
+def parse_sizes(sizes):
+    values = sorted(set(int(size) for size in sizes.split(',')))
+    if values[0] < 1 or values[-1] > MAX_ENTRY_COUNT:
+        raise ValueError('Sizes must be between 1 and %d' % MAX_ENTRY_COUNT)
+    return values
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Anchor batch size sweep')
+    parser.add_argument('--sizes', type=parse_sizes, default='1,2,5,10,20,50,100', help='Comma separated batch sizes')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of transactions per batch size')
+    parser.add_argument('--key-type', default='ed25519', help='Key type of the sending account')
+    parser.add_argument('--kind', action='append', choices=list(KINDS), help='Transaction kind (default: both)')
+    parser.add_argument('--json', help='Write the results to this file')
+    options = parser.parse_args()
+
+    main(options.sizes, options.repeat, options.key_type, options.kind or list(KINDS), options.json)
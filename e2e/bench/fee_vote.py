@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+# Backtest of fee voting. Replays a historical LTO/USD price series against a population of block generators that run
+# fee-vote.py, following the fee vote rules of the node, and reports how well the fee price tracks its target. Runs
+# offline; no node is needed. Requires NumPy.
+#
+# USAGE: python -m e2e.bench.fee_vote PRICES.csv [--voters N] [--participation P] [--target N] [--max-price N]
+#                                     [--threshold T] [--refresh BLOCKS] [--blocks N] [--runs N] [--json FILE]
+
+import argparse
+import csv
+from datetime import datetime, timezone
+from time import monotonic
+import numpy as np
+
+from e2e.bench.stats import print_table, write_json
+
+DEFAULT_FEE_PRICE = 100000  # com.ltonetwork.fee.defaultFeePrice
+MULTIPLIER = 1.1            # FeeVoteStatus.Increase; a decrease divides by it
+PERIOD = 1000               # FunctionalitySettings.feeVoteBlocksPeriod (mainnet)
+BLOCKS_FOR_CHANGE = 600     # FunctionalitySettings.blocksForFeeChange (mainnet)
+BLOCK_TIME = 60             # average-block-delay in seconds
+
+TICKETS = 1 << 16           # Resolution of the stake distribution
+
+TIME_COLUMNS = ['timestamp', 'snapped_at', 'date', 'time']
+
+
+def parse_time(value):
+    try:
+        number = float(value)
+        return number / 1000 if number > 1e11 else number  # Milliseconds or seconds since epoch
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace(' UTC', '').replace('Z', '+00:00'))
+        return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def load_prices(path):
+    """
+    Read a CSV file with a `price` column (in USD) and a time column, like the CoinGecko export. Rows are sorted by time.
+    """
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    time_column = next((column for column in TIME_COLUMNS if rows and column in rows[0]), None)
+    if time_column is None or 'price' not in rows[0]:
+        raise ValueError('%s should have a price column and one of the columns %s' % (path, ', '.join(TIME_COLUMNS)))
+
+    times = np.array([parse_time(row[time_column]) for row in rows if row['price']])
+    prices = np.array([float(row['price']) for row in rows if row['price']])
+    order = np.argsort(times)
+    return times[order], prices[order]
+
+
+def market_per_block(times, prices, blocks, block_time):
+    # Interpolate the series at the time of every block. A series that's shorter than the simulation is repeated.
+    span = times[-1] - times[0]
+    at = times[0] + np.mod(np.arange(blocks) * float(block_time), span if span > 0 else 1)
+    return np.interp(at, times, prices)
+
+
+def generate_voters(rng, options):
+    count = options.voters
+    stake = rng.pareto(options.stake_alpha, count) + 1
+    active = rng.random(count) < options.participation
+
+    # A generator is picked by drawing a ticket; the number of tickets is proportional to the stake
+    tickets = np.repeat(np.arange(count), np.maximum(np.round(stake / stake.sum() * TICKETS), 1).astype(np.int64))
+
+    return {
+        'tickets': tickets,
+        'active': active,                                                  # Inactive generators always vote maintain
+        'offset': rng.integers(0, options.refresh, count),                 # Block at which fee-vote.py first runs
+        'bias': rng.lognormal(0, options.price_noise, count),              # Deviation of the price source
+    }
+
+
+def determine_votes(target, current, threshold):
+    """Vectorized `determine_vote` of fee-vote.py: -1 decrease, 0 maintain, 1 increase."""
+    return np.where(target > current * threshold, 1, 0) - np.where(target < current / threshold, 1, 0)
+
+
+def simulate(market, voters, options, rng):
+    """
+    Fee price per period for every run. The votes in the blocks of period k decide the price of period k + 2, because
+    the price of period k + 1 was already decided at the end of period k - 1 (LevelDBWriter.doAppend). Voters compare
+    their target against that next price, like fee-vote.py does with `next.price` of /fees/status.
+    """
+    runs = options.runs
+    periods = len(market) // options.period
+    heights = np.arange(1, options.period + 1)
+
+    price = np.full(runs, float(DEFAULT_FEE_PRICE))
+    next_price = price.copy()
+    trajectory = np.empty((runs, periods))
+    votes = np.empty((runs, periods), dtype=np.int64)
+
+    for k in range(periods):
+        trajectory[:, k] = price
+        blocks = k * options.period + heights - 1
+
+        # The generator of every block, picked by stake, and the moment it last ran fee-vote.py
+        miners = voters['tickets'][rng.integers(0, len(voters['tickets']), (runs, options.period))]
+        sampled = np.maximum(blocks - np.mod(blocks - voters['offset'][miners], options.refresh), 0)
+
+        observed = market[sampled] * voters['bias'][miners]
+        target = np.minimum(options.target / observed, options.max_price)
+        vote = determine_votes(target, next_price[:, None], options.threshold) * voters['active'][miners]
+
+        votes[:, k] = vote.sum(axis=1)
+        status = np.trunc(votes[:, k] / options.blocks_for_change)  # Division rounds towards 0
+        multiplier = np.where(status > 0, MULTIPLIER, np.where(status < 0, 1 / MULTIPLIER, 1))
+
+        price, next_price = next_price, np.round(next_price * multiplier)
+
+    return trajectory, votes
+
+
+def statistics(trajectory, market, options):
+    periods = trajectory.shape[1]
+    period_market = market[:periods * options.period].reshape(periods, options.period).mean(axis=1)
+    ideal = np.minimum(options.target / period_market, options.max_price)
+
+    error = np.abs(np.log(trajectory / ideal))
+    in_band = error <= np.log(options.threshold)
+    direction = np.sign(np.diff(trajectory, axis=1))
+    changes = direction != 0
+
+    # A reversal is a change in the opposite direction of the previous change
+    index = np.where(changes, np.arange(direction.shape[1]), -1)
+    previous = np.maximum.accumulate(np.pad(index, ((0, 0), (1, 0)), constant_values=-1)[:, :-1], axis=1)
+    previous_direction = np.take_along_axis(direction, np.maximum(previous, 0), axis=1) * (previous >= 0)
+    reversals = changes & (direction * previous_direction < 0)
+    first_in_band = np.where(in_band.any(axis=1), in_band.argmax(axis=1), periods)
+
+    per_run = {
+        'error': np.median(error, axis=1),
+        'in_band': in_band.mean(axis=1),
+        'convergence': first_in_band * options.period,
+        'changes': changes.sum(axis=1),
+        'reversals': reversals.sum(axis=1),
+        'final': trajectory[:, -1],
+    }
+
+    return ideal, per_run
+
+
+def main(options):
+    rng = np.random.default_rng(options.seed)
+    times, prices = load_prices(options.prices)
+    blocks = options.blocks or int((times[-1] - times[0]) / options.block_time)
+
+    start = monotonic()
+    market = market_per_block(times, prices, blocks, options.block_time)
+    voters = generate_voters(rng, options)
+    trajectory, votes = simulate(market, voters, options, rng)
+    ideal, per_run = statistics(trajectory, market, options)
+    duration = monotonic() - start
+
+    print('%d blocks, %d periods, %d runs, %d voters in %.2fs' % (
+        blocks, trajectory.shape[1], options.runs, options.voters, duration
+    ))
+    print()
+    print_table(
+        ['statistic', 'p10', 'p50', 'p90'],
+        [
+            [name, *(fmt % np.percentile(per_run[key], p) for p in (10, 50, 90))]
+            for name, key, fmt in [
+                ('median |log error|', 'error', '%.3f'),
+                ('periods in band', 'in_band', '%.2f'),
+                ('blocks to band', 'convergence', '%.0f'),
+                ('price changes', 'changes', '%.0f'),
+                ('reversals', 'reversals', '%.0f'),
+                ('final price', 'final', '%.0f'),
+            ]
+        ]
+    )
+
+    if options.json:
+        median = np.median(trajectory, axis=0)
+        write_json(options.json, {
+            'options': {key: value for key, value in vars(options).items() if key != 'json'},
+            'statistics': {key: np.percentile(values, [10, 50, 90]).tolist() for key, values in per_run.items()},
+            'trajectory': [
+                {'height': k * options.period, 'ideal': float(ideal[k]), 'price': float(median[k]),
+                 'votes': int(np.median(votes[:, k]))}
+                for k in range(trajectory.shape[1])
+            ],
+        })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fee vote backtest')
+    parser.add_argument('prices', help='CSV file with the LTO/USD price history')
+    parser.add_argument('--voters', type=int, default=100, help='Number of block generators')
+    parser.add_argument('--participation', type=float, default=0.8, help='Fraction of generators that vote')
+    parser.add_argument('--stake-alpha', type=float, default=1.5, help='Pareto shape of the stake distribution')
+    parser.add_argument('--price-noise', type=float, default=0.01, help='Deviation of the price source per voter')
+    parser.add_argument('--target', type=float, default=20000, help='LTO_FEE_TARGET')
+    parser.add_argument('--max-price', type=float, default=100000, help='LTO_FEE_MAX_PRICE')
+    parser.add_argument('--threshold', type=float, default=1.1, help='Ratio between target and price to vote a change')
+    parser.add_argument('--refresh', type=int, default=10, help='Blocks between two runs of fee-vote.py')
+    parser.add_argument('--period', type=int, default=PERIOD, help='Fee vote period in blocks')
+    parser.add_argument('--blocks-for-change', type=int, default=BLOCKS_FOR_CHANGE, help='Net votes to change the price')
+    parser.add_argument('--block-time', type=float, default=BLOCK_TIME, help='Seconds per block')
+    parser.add_argument('--blocks', type=int, help='Number of blocks (default: the length of the price history)')
+    parser.add_argument('--runs', type=int, default=20, help='Number of simulations with different block generators')
+    parser.add_argument('--seed', type=int, help='Random seed')
+    parser.add_argument('--json', help='Write the statistics and the median price per period to this file')
+
+    main(parser.parse_args())
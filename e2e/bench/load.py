@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+# Open-loop transaction load generator. Transactions are built with the e2e step library and broadcast at a fixed
+# rate, without waiting for earlier transactions, to find the transaction rate the node can sustain.
+#
+# USAGE: python -m e2e.bench.load [--rate TPS] [--duration SECONDS] [--mix anchor=5,transfer=1,...] [--json FILE]
+
+import argparse
+import json
+import random
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from os import urandom
+from time import monotonic, sleep
+from types import SimpleNamespace
+import requests
+
+from e2e.bench.stats import summary, ms, print_table, write_json
+from e2e.common.funding import fund_accounts
+from e2e.common.tools import URL, TRACKER, generate_account
+from e2e.steps.anchor import anchor_tx
+from e2e.steps.association import association_tx
+from e2e.steps.data import set_data_tx
+from e2e.steps.mapped_anchor import mapped_anchor_tx
+from e2e.steps.mass_transfer import mass_transfer_tx
+from e2e.steps.statement import statement_tx
+from e2e.steps.transfer import transfer_tx
+
+BUILDERS = {
+    'anchor': lambda context, sender, i: anchor_tx(context, sender),
+    'mapped_anchor': lambda context, sender, i: mapped_anchor_tx(context, sender, urandom(8).hex(), urandom(8).hex()),
+    'transfer': lambda context, sender, i: transfer_tx(context, 'recipient', 1, sender),
+    'mass_transfer': lambda context, sender, i: mass_transfer_tx(
+        context, [['recipient', '0.00000001'], ['recipient', '0.00000001']], sender
+    ),
+    'data': lambda context, sender, i: set_data_tx(context, sender, {'load': i}),
+    'association': lambda context, sender, i: association_tx(context, sender, 1, 'recipient', urandom(8).hex()),
+    'statement': lambda context, sender, i: statement_tx(context, sender, 1),
+}
+
+local = threading.local()
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        if name not in BUILDERS:
+            raise ValueError('Unknown transaction type "%s", choose from %s' % (name, ', '.join(BUILDERS)))
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def session():
+    if not hasattr(local, 'session'):
+        local.session = requests.Session()
+    return local.session
+
+
+class LoadGenerator:
+    def __init__(self, context, senders, mix):
+        self.context = context
+        self.senders = senders
+        self.types = list(mix.keys())
+        self.weights = list(mix.values())
+        self.lock = threading.Lock()
+        self.records = []
+        self.rejected = Counter()
+        self.pending = []
+
+    def send(self, i, scheduled):
+        tx_type = random.choices(self.types, self.weights)[0]
+        record = {'type': tx_type, 'lag': monotonic() - scheduled}
+
+        start = monotonic()
+        transaction = BUILDERS[tx_type](self.context, self.senders[i % len(self.senders)], i)
+        record['sign'] = monotonic() - start
+
+        start = monotonic()
+        try:
+            response = session().post(
+                URL + '/transactions/broadcast',
+                data=json.dumps(transaction.to_json()),
+                headers={'content-type': 'application/json'},
+                timeout=30
+            )
+            record['broadcast'] = monotonic() - start
+            record['accepted'] = response.status_code == 200
+            reason = None if record['accepted'] else '%d %s' % (response.status_code, response.text[:100])
+        except requests.RequestException as e:
+            record['broadcast'] = monotonic() - start
+            record['accepted'] = False
+            reason = type(e).__name__
+
+        with self.lock:
+            self.records.append(record)
+            if reason:
+                self.rejected[reason] += 1
+
+        if record['accepted']:
+            future = TRACKER.watch(response.json()['id'])
+            future.add_done_callback(lambda f: self.confirmed(record, start, f))
+            with self.lock:
+                self.pending.append(future)
+
+    @staticmethod
+    def confirmed(record, start, future):
+        if not future.exception():
+            record['block'] = monotonic() - start
+
+    def run(self, rate, duration, concurrency):
+        count = int(rate * duration)
+        start = monotonic()
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            for i in range(count):
+                scheduled = start + i / rate
+                delay = scheduled - monotonic()
+                if delay > 0:
+                    sleep(delay)
+                executor.submit(self.send, i, scheduled)
+
+        return monotonic() - start
+
+    def drain(self, timeout):
+        deadline = monotonic() + timeout
+        for future in list(self.pending):
+            try:
+                future.result(max(0, deadline - monotonic()))
+            except Exception:
+                pass
+
+
+def report(generator, rate, elapsed):
+    by_type = defaultdict(list)
+    for record in generator.records:
+        by_type[record['type']].append(record)
+
+    result = {'target_rate': rate, 'elapsed': elapsed, 'types': {}, 'rejected': dict(generator.rejected)}
+    rows = []
+    for tx_type, records in sorted(by_type.items()) + [('total', generator.records)]:
+        confirmed = [r['block'] for r in records if 'block' in r]
+        stats = {
+            'sent': len(records),
+            'accepted': sum(1 for r in records if r['accepted']),
+            'confirmed': len(confirmed),
+            'lag': summary([r['lag'] for r in records]),
+            'sign': summary([r['sign'] for r in records]),
+            'broadcast': summary([r['broadcast'] for r in records]),
+            'block': summary(confirmed),
+        }
+        result['types'][tx_type] = stats
+        rows.append([
+            tx_type, stats['sent'], stats['sent'] - stats['accepted'], stats['confirmed'],
+            ms(stats['broadcast']['p50']), ms(stats['broadcast']['p99']),
+            ms(stats['block']['p50']), ms(stats['block']['p90']), ms(stats['block']['p99']),
+        ])
+
+    total = result['types']['total']
+    result['send_rate'] = total['sent'] / elapsed
+    result['confirmed_rate'] = total['confirmed'] / elapsed
+    result['late'] = sum(1 for r in generator.records if r['lag'] > 1 / rate)
+
+    print_table(
+        ['type', 'sent', 'rejected', 'confirmed', 'bcast p50', 'bcast p99', 'block p50', 'block p90', 'block p99'],
+        rows
+    )
+    print('\ntarget %.1f tx/s, sent %.1f tx/s, confirmed %.1f tx/s, %d sent late' % (
+        rate, result['send_rate'], result['confirmed_rate'], result['late']
+    ))
+    for reason, count in generator.rejected.most_common(10):
+        print('  rejected %5d  %s' % (count, reason))
+
+    return result
+
+
+def main(rate, duration, mix, senders, concurrency, drain, json_file):
+    context = SimpleNamespace(users={}, tx_ids=[])
+    context.users['recipient'] = generate_account()
+    names = ['sender%d' % i for i in range(senders)]
+    for name in names:
+        context.users[name] = generate_account()
+
+    # Fund every sender with enough for its share of the most expensive transaction type, plus 10% margin. The
+    # transfers only send a few satoshi, which is negligible.
+    max_fee = max(BUILDERS[tx_type](context, names[0], 0).tx_fee for tx_type in mix) + 2
+    amount = int(max_fee * rate * duration / senders * 1.1) + max_fee
+    fund_accounts(context, [{'recipient': context.users[name].address, 'amount': amount} for name in names])
+
+    generator = LoadGenerator(context, names, mix)
+    elapsed = generator.run(rate, duration, concurrency)
+    generator.drain(drain)
+
+    result = report(generator, rate, elapsed)
+    if json_file:
+        write_json(json_file, result)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Open-loop transaction load generator')
+    parser.add_argument('--rate', type=float, default=10, help='Target transactions per second')
+    parser.add_argument('--duration', type=float, default=60, help='Duration of the load in seconds')
+    parser.add_argument('--mix', type=parse_mix, default='anchor', help='Weighted mix, e.g. anchor=5,transfer=1')
+    parser.add_argument('--senders', type=int, default=10, help='Number of sending accounts')
+    parser.add_argument('--concurrency', type=int, default=64, help='Maximum number of requests in flight')
+    parser.add_argument('--drain', type=float, default=120, help='Seconds to wait for confirmations after the load')
+    parser.add_argument('--json', help='Write the results to this file')
+    options = parser.parse_args()
+
+    main(options.rate, options.duration, options.mix, options.senders, options.concurrency, options.drain,
+         options.json)
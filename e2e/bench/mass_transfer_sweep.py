@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+# Sweep the number of recipients per mass transfer and the key type of the sender, to size payout batches. For every
+# combination it measures signing time, transaction size, broadcast latency (the node validates the transaction before
+# it responds) and time to confirmation, and checks that the balance of every recipient changed.
+#
+# USAGE: python -m e2e.bench.mass_transfer_sweep [--sizes 1,2,5,...] [--key-type TYPE ...] [--repeat N] [--json FILE]
+
+import argparse
+import json
+from collections import defaultdict
+from concurrent.futures import Future
+from time import monotonic
+from types import SimpleNamespace
+import requests
+
+from e2e.bench.stats import summary, ms, print_table, write_json
+from e2e.common.funding import fund_accounts
+from e2e.common.keypool import KEY_TYPES
+from e2e.common.snapshot import take_snapshot
+from e2e.common.tools import URL, TRACKER, generate_account
+from e2e.steps.mass_transfer import mass_transfer_tx
+from lto.transactions import MassTransfer
+
+MAX_TRANSFER_COUNT = 100  # MassTransferTransaction.MaxTransferCount
+AMOUNT = '0.00000001'     # LTO per recipient per transaction
+
+
+def watch(sample, id):
+    # Time the confirmation when it's seen, not when the loop below gets to it
+    done = Future()
+
+    def confirmed(future):
+        if not future.exception():
+            sample['block'] = monotonic() - sample['sent']
+        done.set_result(None)
+
+    TRACKER.watch(id).add_done_callback(confirmed)
+    return done
+
+
+def balances(addresses):
+    start = monotonic()
+    snapshot = take_snapshot(addresses)
+    return {address: state['balance']['regular'] for address, state in snapshot['accounts'].items()}, \
+        monotonic() - start
+
+
+def measure(context, session, key_type, size, repeat):
+    sender = 'sender_%s' % key_type
+    recipients = ['recipient%d' % i for i in range(size)]
+    addresses = [context.users[name].address for name in recipients]
+    before, _ = balances(addresses)
+
+    samples = []
+    for _ in range(repeat):
+        start = monotonic()
+        transaction = mass_transfer_tx(context, [[name, AMOUNT] for name in recipients], sender)
+        sign = monotonic() - start
+
+        body = json.dumps(transaction.to_json())
+        start = monotonic()
+        response = session.post(URL + '/transactions/broadcast', data=body,
+                                headers={'content-type': 'application/json'})
+        broadcast = monotonic() - start
+
+        sample = {'sign': sign, 'broadcast': broadcast, 'json_bytes': len(body),
+                  'binary_bytes': len(transaction.to_binary()), 'accepted': response.status_code == 200,
+                  'fee': transaction.tx_fee, 'sent': start}
+        if sample['accepted']:
+            sample['done'] = watch(sample, response.json()['id'])
+        samples.append(sample)
+
+    for sample in samples:
+        if sample['accepted']:
+            sample.pop('done').result()
+
+    # Every confirmed transaction credits every recipient once
+    after, verify = balances(addresses)
+    credit = sum(1 for s in samples if 'block' in s) * int(float(AMOUNT) * 100000000)
+    missing = sum(1 for address in addresses if after[address] - before[address] != credit)
+
+    accepted = [s for s in samples if s['accepted']]
+    return {
+        'key_type': key_type,
+        'recipients': size,
+        'accepted': len(accepted),
+        'rejected': len(samples) - len(accepted),
+        'confirmed': sum(1 for s in samples if 'block' in s),
+        'missing': missing,
+        'sign': summary([s['sign'] for s in samples]),
+        'broadcast': summary([s['broadcast'] for s in samples]),
+        'block': summary([s['block'] for s in samples if 'block' in s]),
+        'verify': verify,
+        'json_bytes': samples[0]['json_bytes'],
+        'binary_bytes': samples[0]['binary_bytes'],
+        'fee': samples[0]['fee'],
+        'fee_per_recipient': samples[0]['fee'] / size,
+    }
+
+
+def curves(results):
+    # Median per number of recipients, per key type, for plotting
+    by_key_type = defaultdict(lambda: defaultdict(list))
+    for r in results:
+        curve = by_key_type[r['key_type']]
+        curve['recipients'].append(r['recipients'])
+        curve['sign'].append(r['sign']['p50'])
+        curve['broadcast'].append(r['broadcast']['p50'])
+        curve['block'].append(r['block']['p50'])
+        curve['binary_bytes'].append(r['binary_bytes'])
+        curve['fee_per_recipient'].append(r['fee_per_recipient'])
+    return by_key_type
+
+
+def main(sizes, repeat, key_types, json_file):
+    context = SimpleNamespace(users={}, tx_ids=[])
+    for i in range(sizes[-1]):
+        context.users['recipient%d' % i] = generate_account()
+    for key_type in key_types:
+        context.users['sender_%s' % key_type] = generate_account(key_type)
+
+    amount = sum(MassTransfer.BASE_FEE + (MassTransfer.VAR_FEE + 1) * size for size in sizes) * repeat
+    fund_accounts(context, [
+        {'recipient': context.users['sender_%s' % key_type].address, 'amount': amount} for key_type in key_types
+    ])
+
+    session = requests.Session()
+    results = [measure(context, session, key_type, size, repeat) for key_type in key_types for size in sizes]
+
+    print_table(
+        ['key type', 'recipients', 'sign p50', 'sign/rcpt', 'binary B', 'B/rcpt', 'bcast p50', 'bcast p99',
+         'block p50', 'block p90', 'fee/rcpt', 'rejected', 'missing'],
+        [
+            [r['key_type'], r['recipients'], ms(r['sign']['p50']), '%.3f' % (r['sign']['p50'] * 1000 / r['recipients']),
+             r['binary_bytes'], '%.1f' % (r['binary_bytes'] / r['recipients']), ms(r['broadcast']['p50']),
+             ms(r['broadcast']['p99']), ms(r['block']['p50']), ms(r['block']['p90']),
+             '%.3f' % (r['fee_per_recipient'] / 100000000), r['rejected'], r['missing']]
+            for r in results
+        ]
+    )
+
+    missing = sum(r['missing'] for r in results)
+    if missing:
+        print('\n%d recipient balances did not change by the transferred amount' % missing)
+
+    if json_file:
+        write_json(json_file, {'repeat': repeat, 'results': results, 'curves': curves(results)})
+
+
+def parse_sizes(sizes):
+    values = sorted(set(int(size) for size in sizes.split(',')))
+    if values[0] < 1 or values[-1] > MAX_TRANSFER_COUNT:
+        raise ValueError('Sizes must be between 1 and %d' % MAX_TRANSFER_COUNT)
+    return values
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mass transfer fan-out sweep')
+    parser.add_argument('--sizes', type=parse_sizes, default='1,2,5,10,20,50,100',
+                        help='Comma separated numbers of recipients')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of transactions per combination')
+    parser.add_argument('--key-type', action='append', choices=KEY_TYPES, help='Key type of the sender (default: all)')
+    parser.add_argument('--json', help='Write the results and the curves per key type to this file')
+    options = parser.parse_args()
+
+    main(options.sizes, options.repeat, options.key_type or KEY_TYPES, options.json)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+# Closed-loop load test of the read path of the REST API. Accounts are seeded with data, associations, leases,
+# sponsorships and a transaction history using the e2e step library. Then, for every concurrency level, that many
+# clients send GET requests back to back over keep-alive connections. Latency and throughput are reported per
+# endpoint and can be compared against a baseline, which is the --json output of an earlier run.
+#
+# USAGE: python -m e2e.bench.read_load [--concurrency 1,8,32] [--duration SECONDS] [--baseline FILE] [--json FILE]
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+from e2e.bench.stats import summary, ms, print_table, write_json
+from e2e.common.funding import fund_accounts
+from e2e.common.tools import URL, generate_account
+from e2e.steps.association import association
+from e2e.steps.data import set_data
+from e2e.steps.lease import lease
+from e2e.steps.sponsorship import sponsor
+from e2e.steps.transfer import transfer_to
+
+ENDPOINTS = {
+    'balance': '/addresses/balance/%s',
+    'data': '/addresses/data/%s',
+    'transactions': '/transactions/address/%s?limit=100',
+    'associations': '/associations/status/%s',
+    'leases': '/leasing/active/%s',
+    'sponsorship': '/sponsorship/status/%s',
+}
+
+# Regression checks: metric, and whether a higher value is worse
+CHECKS = [('p50', True), ('p95', True), ('p99', True), ('throughput', False)]
+
+LTO = 100000000
+SEED_FEES = 20 * LTO  # Data, association, lease and sponsorship fees plus the leased amount, with margin
+
+
+def parse_levels(levels):
+    return [int(level) for level in levels.split(',')]
+
+
+def parse_endpoints(names):
+    for name in names.split(','):
+        if name not in ENDPOINTS:
+            raise ValueError('Unknown endpoint "%s", choose from %s' % (name, ', '.join(ENDPOINTS)))
+    return names.split(',')
+
+
+def seed(context, names, history, entries):
+    """
+    Give every account some state for each endpoint to return. Every account interacts with the next one, so each of
+    them has incoming and outgoing associations, leases and sponsorships. The accounts are seeded in parallel.
+    """
+    def seed_account(i, name):
+        other = names[(i + 1) % len(names)]
+        set_data(context, name, {'bench_%d' % n: 'value %d' % n for n in range(entries)})
+        association(context, name, 1, other, 'bench')
+        lease(context, name, other, LTO)
+        sponsor(context, other, name)
+        for _ in range(history):
+            transfer_to(context, other, 1, name)
+
+    with ThreadPoolExecutor(len(names)) as executor:
+        for future in [executor.submit(seed_account, i, name) for i, name in enumerate(names)]:
+            future.result()
+
+
+class Connection:
+    """
+    Minimal HTTP/1.1 client on top of asyncio streams. The connection is kept alive between requests, so the latency
+    doesn't include the TCP handshake.
+    """
+
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        self.ssl = parsed.scheme == 'https'
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+        self.writer.write(('GET %s HTTP/1.1\r\nHost: %s\r\nAccept: application/json\r\n\r\n' % (
+            path, self.host
+        )).encode())
+        await self.writer.drain()
+
+        version, status = (await self.reader.readline()).split()[:2]
+        headers = {}
+        while True:
+            line = (await self.reader.readline()).decode().strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                body += await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        # An HTTP/1.0 server closes the connection after every response, unless it's asked to keep it alive
+        persistent = version == b'HTTP/1.1' or headers.get('connection', '').lower() == 'keep-alive'
+        if not persistent or headers.get('connection', '').lower() == 'close':
+            self.close()
+
+        return int(status), body
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def client(requests, deadline, records):
+    connection = Connection(URL)
+    try:
+        while monotonic() < deadline:
+            endpoint, path = next(requests)
+            start = monotonic()
+            try:
+                status, _ = await connection.get(path)
+                ok = status == 200
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                connection.close()
+                ok = False
+            records.append((endpoint, monotonic() - start, ok))
+    finally:
+        connection.close()
+
+
+async def run_level(requests, concurrency, duration, warmup):
+    if warmup > 0:
+        await asyncio.gather(*(client(requests, monotonic() + warmup, []) for _ in range(concurrency)))
+
+    records = []
+    start = monotonic()
+    await asyncio.gather(*(client(requests, start + duration, records) for _ in range(concurrency)))
+    return records, monotonic() - start
+
+
+def level_report(records, elapsed):
+    result = {}
+    for endpoint, group in itertools.groupby(sorted(records, key=lambda r: r[0]), key=lambda r: r[0]):
+        group = list(group)
+        latency = [r[1] for r in group if r[2]]
+        result[endpoint] = dict(summary(latency), errors=len(group) - len(latency),
+                                throughput=len(latency) / elapsed)
+
+    latency = [r[1] for r in records if r[2]]
+    result['total'] = dict(summary(latency), errors=len(records) - len(latency), throughput=len(latency) / elapsed)
+    return result
+
+
+def compare(results, baseline, threshold, slack):
+    """
+    Metrics that are worse than the baseline by more than `threshold` (relative). Latencies also need to be worse by
+    more than `slack` seconds, so sub-millisecond jitter on a fast node isn't reported.
+    """
+    regressions = []
+    for level, endpoints in results['levels'].items():
+        for endpoint, stats in endpoints.items():
+            base = baseline.get('levels', {}).get(level, {}).get(endpoint)
+            if not base:
+                continue
+            for metric, higher_is_worse in CHECKS:
+                current, previous = stats.get(metric), base.get(metric)
+                if current is None or not previous:
+                    continue
+                change = current / previous - 1
+                if higher_is_worse and change > threshold and current - previous > slack:
+                    regressions.append((level, endpoint, metric, previous, current, change))
+                elif not higher_is_worse and -change > threshold:
+                    regressions.append((level, endpoint, metric, previous, current, change))
+    return regressions
+
+
+def fmt(metric, value):
+    return '%.1f/s' % value if metric == 'throughput' else ms(value) + 'ms'
+
+
+def main(options):
+    context = SimpleNamespace(users={}, tx_ids=[])
+    names = ['holder%d' % i for i in range(options.accounts)]
+    for name in names:
+        context.users[name] = generate_account()
+
+    start = monotonic()
+    fund_accounts(context, [
+        {'recipient': context.users[name].address, 'amount': SEED_FEES + options.history * (LTO + 1)}
+        for name in names
+    ])
+    seed(context, names, options.history, options.entries)
+    print('Seeded %d accounts in %.1fs' % (len(names), monotonic() - start))
+
+    paths = [(endpoint, ENDPOINTS[endpoint] % context.users[name].address)
+             for name in names for endpoint in options.endpoints]
+
+    results = {'options': {key: value for key, value in vars(options).items() if key not in ('json', 'baseline')},
+               'levels': {}}
+    for concurrency in options.concurrency:
+        records, elapsed = asyncio.run(run_level(itertools.cycle(paths), concurrency, options.duration,
+                                                 options.warmup))
+        results['levels'][str(concurrency)] = level_report(records, elapsed)
+
+    rows = [
+        [level, endpoint, stats['count'], stats['errors'], '%.1f' % stats['throughput'],
+         ms(stats['p50']), ms(stats['p95']), ms(stats['p99'])]
+        for level, endpoints in results['levels'].items()
+        for endpoint, stats in endpoints.items()
+    ]
+    print()
+    print_table(['clients', 'endpoint', 'requests', 'errors', 'req/s', 'p50', 'p95', 'p99'], rows)
+
+    if options.json:
+        write_json(options.json, results)
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, options.threshold, options.slack / 1000)
+
+        print()
+        if not regressions:
+            print('No regressions against %s (threshold %.0f%%)' % (options.baseline, options.threshold * 100))
+        for level, endpoint, metric, previous, current, change in regressions:
+            print('REGRESSION %s clients, %s %s: %s -> %s (%+.0f%%)' % (
+                level, endpoint, metric, fmt(metric, previous), fmt(metric, current), change * 100
+            ))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='REST API read path load test')
+    parser.add_argument('--concurrency', type=parse_levels, default='1,8,32', help='Comma separated client counts')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds per concurrency level')
+    parser.add_argument('--warmup', type=float, default=5, help='Seconds of unrecorded requests before each level')
+    parser.add_argument('--endpoints', type=parse_endpoints, default=','.join(ENDPOINTS),
+                        help='Comma separated, from %s' % ', '.join(ENDPOINTS))
+    parser.add_argument('--accounts', type=int, default=10, help='Number of seeded accounts')
+    parser.add_argument('--history', type=int, default=5, help='Transfers per account, for the transaction history')
+    parser.add_argument('--entries', type=int, default=10, help='Data entries per account')
+    parser.add_argument('--baseline', help='Compare against the --json output of an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative change that counts as a regression')
+    parser.add_argument('--slack', type=float, default=1, help='Latency change in ms that is always tolerated')
+    parser.add_argument('--json', help='Write the results to this file')
+
+    main(parser.parse_args())
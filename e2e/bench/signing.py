@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# Sign and verify throughput per key type and transaction type/version, plus the speed-up of signing in bulk with a
+# process pool. Runs offline; no node is needed.
+#
+# USAGE: python -m e2e.bench.signing [--count N] [-j WORKERS] [--key-type TYPE ...] [--json FILE]
+
+import argparse
+import os
+from os import urandom
+from time import monotonic
+
+from e2e.bench.stats import print_table, write_json
+from e2e.common.keypool import KEY_TYPES
+from e2e.common.signing import sign_all
+from e2e.common.tools import generate_account
+from lto.binary import Binary
+from lto.transactions import Anchor, Association, Data, Lease, MappedAnchor, MassTransfer, Statement, Transfer
+
+# Builders for unsigned transactions. Versions before v3 only support ed25519 keys.
+TRANSACTIONS = {
+    'anchor': (lambda recipient: Anchor(urandom(32)), [1, 3]),
+    'mapped_anchor': (lambda recipient: MappedAnchor({urandom(32): urandom(32)}), [3]),
+    'transfer': (lambda recipient: Transfer(recipient, 100000000), [2, 3]),
+    'mass_transfer': (lambda recipient: MassTransfer([{'recipient': recipient, 'amount': 1}] * 10), [1, 3]),
+    'data': (lambda recipient: Data({'foo': 'bar', 'number': 42}), [3]),
+    'lease': (lambda recipient: Lease(recipient, 100000000), [2, 3]),
+    'association': (lambda recipient: Association(1, recipient, subject=Binary(urandom(16))), [1, 3, 4]),
+    'statement': (lambda recipient: Statement(1, recipient, subject=Binary(urandom(16))), [3]),
+}
+
+
+def build(tx_type, version, count, recipient):
+    builder, _ = TRANSACTIONS[tx_type]
+    transactions = [builder(recipient) for _ in range(count)]
+    for transaction in transactions:
+        transaction.version = version
+    return transactions
+
+
+def measure(account, tx_type, version, count):
+    transactions = build(tx_type, version, count, account.address)
+
+    start = monotonic()
+    for transaction in transactions:
+        transaction.sign_with(account)
+    sign = monotonic() - start
+
+    start = monotonic()
+    for transaction in transactions:
+        assert account.verify(transaction.to_binary(), transaction.proofs[0])
+    verify = monotonic() - start
+
+    return {
+        'key_type': account.key_type,
+        'tx_type': tx_type,
+        'version': version,
+        'sign_per_sec': count / sign,
+        'verify_per_sec': count / verify,
+    }
+
+
+def measure_batch(account, count, workers):
+    transactions = build('anchor', 3, count, account.address)
+    start = monotonic()
+    signed = sign_all(transactions, account, workers)
+    duration = monotonic() - start
+    assert all(account.verify(tx.to_binary(), tx.proofs[0]) for tx in signed)
+    return count / duration
+
+
+def main(count, workers, key_types, json_file):
+    results = []
+    batches = []
+
+    for key_type in key_types:
+        account = generate_account(key_type)
+        for tx_type, (_, versions) in TRANSACTIONS.items():
+            for version in versions:
+                if version < 3 and key_type != 'ed25519':
+                    continue
+                results.append(measure(account, tx_type, version, count))
+
+        batches.append({
+            'key_type': key_type,
+            'workers': workers,
+            'single_per_sec': measure_batch(account, count * 4, 1),
+            'batch_per_sec': measure_batch(account, count * 4, workers),
+        })
+
+    print_table(
+        ['key type', 'tx type', 'version', 'sign/s', 'verify/s'],
+        [[r['key_type'], r['tx_type'], 'v%d' % r['version'], '%.0f' % r['sign_per_sec'], '%.0f' % r['verify_per_sec']]
+         for r in results]
+    )
+    print()
+    print_table(
+        ['key type', 'single/s', 'batch/s', 'workers', 'speed-up'],
+        [[b['key_type'], '%.0f' % b['single_per_sec'], '%.0f' % b['batch_per_sec'], b['workers'],
+          '%.1fx' % (b['batch_per_sec'] / b['single_per_sec'])] for b in batches]
+    )
+
+    if json_file:
+        write_json(json_file, {'count': count, 'results': results, 'batch': batches})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Signing and verification benchmark')
+    parser.add_argument('--count', type=int, default=200, help='Transactions per key type and transaction type')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help='Processes for batch signing')
+    parser.add_argument('--key-type', action='append', choices=KEY_TYPES, help='Key type (default: all)')
+    parser.add_argument('--json', help='Write the results to this file')
+    options = parser.parse_args()
+
+    main(options.count, options.workers, options.key_type or KEY_TYPES, options.json)
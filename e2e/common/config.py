@@ -2,5 +2,9 @@ import os
 
 api_key = os.environ.get('LTO_API_KEY', "open")
 node_url = "http://localhost:6869"
+node = os.environ.get('LTO_E2E_NODE', 'docker')  # 'docker' or 'memory'
 chain_id = 'Z'
 seed = os.environ.get('LTO_WALLET_SEED', "root")
+key_pool = os.environ.get('LTO_E2E_KEY_POOL', os.path.join(os.path.dirname(os.path.realpath(__file__)), '../.keypool'))
+timings = os.environ.get('LTO_E2E_TIMINGS', os.path.join(os.path.dirname(os.path.realpath(__file__)), '../.timings.json'))
+utx_max_size = os.environ.get('LTO_E2E_UTX_MAX_SIZE')  # UTX pool limit of the node started by run_public_node
@@ -0,0 +1,138 @@
+import logging
+import threading
+from concurrent.futures import Future
+from time import monotonic
+import requests
+
+MAX_BLOCKS_PER_REQUEST = 100
+RESUME_BLOCKS = 10  # Blocks to scan back when resuming, as blocks might be forged between broadcast and watch
+GRACE = 30  # Seconds to wait for a future beyond its deadline, in case the tracker thread itself is stuck
+
+log = logging.getLogger(__name__)
+
+
+class ConfirmationTracker:
+    """
+    Waits for many transactions at once. A single background thread watches `/blocks/height` and, whenever the chain
+    grows, scans the new blocks with `/blocks/seq` to resolve every pending transaction id in one go.
+    """
+
+    def __init__(self, url, step=0.1, timeout=180):
+        self.url = url
+        self.step = step
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.pending = {}
+        self.scanned = None
+        self.listeners = []
+        self.lock = threading.Condition()
+        self.thread = None
+
+    def watch(self, id, timeout=None):
+        future = Future()
+        deadline = monotonic() + (timeout or self.timeout)
+
+        with self.lock:
+            idle = not self.pending
+            self.pending.setdefault(id, []).append((future, deadline))
+            self._ensure_running()
+            if idle:
+                self.lock.notify()
+
+        return future
+
+    def wait(self, id, timeout=None):
+        return self.watch(id, timeout).result(self.result_timeout(timeout))
+
+    def result_timeout(self, timeout=None):
+        # Futures are expired by the tracker thread, so waiting longer than this means the thread doesn't get to it
+        return (timeout or self.timeout) + GRACE
+
+    def subscribe(self, listener):
+        # The listener is called with every transaction (as json) found in a scanned block.
+        self.listeners.append(listener)
+
+    def _ensure_running(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name='confirmation-tracker', daemon=True)
+            self.thread.start()
+
+    def _get(self, endpoint):
+        response = self.session.get('%s%s' % (self.url, endpoint), timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def _run(self):
+        resumed = True
+
+        while True:
+            with self.lock:
+                while not self.pending:
+                    resumed = True
+                    self.lock.wait()
+
+            try:
+                self._tick(resumed)
+                resumed = False
+            except requests.RequestException:
+                pass  # The node might be busy; try again on the next tick
+            except Exception:
+                # Don't let an unexpected response end the thread, as the pending futures would never expire
+                log.exception('Confirmation tracker failed to scan the chain')
+
+            self._expire()
+
+            with self.lock:
+                self.lock.wait(self.step)
+
+    def _tick(self, resumed):
+        height = self._get('/blocks/height')['height']
+
+        if resumed:
+            # Nothing was scanned while idle. A transaction broadcast just before the last blocks were forged can be
+            # in one of those blocks, so start a few blocks back.
+            self.scanned = max(self.scanned or 1, height - RESUME_BLOCKS)
+
+        # The last scanned block could have been extended by micro blocks after it was read, so it's scanned again on
+        # every tick, also when the height didn't change.
+        start = self.scanned
+        while start <= height:
+            end = min(height, start + MAX_BLOCKS_PER_REQUEST - 1)
+            for block in self._get('/blocks/seq/%d/%d' % (start, end)):
+                self._resolve(block)
+            start = end + 1
+
+        self.scanned = height
+
+    def _resolve(self, block):
+        for tx in block.get('transactions', []):
+            tx.setdefault('height', block['height'])
+
+            for listener in self.listeners:
+                try:
+                    listener(tx)
+                except Exception:
+                    log.exception('Listener of the confirmation tracker failed on transaction %s', tx.get('id'))
+
+            with self.lock:
+                waiting = self.pending.pop(tx['id'], [])
+            for future, _ in waiting:
+                if not future.done():
+                    future.set_result(tx)
+
+    def _expire(self):
+        now = monotonic()
+        expired = []
+
+        with self.lock:
+            for id, waiting in list(self.pending.items()):
+                remaining = [(future, deadline) for future, deadline in waiting if deadline > now]
+                expired += [(id, future) for future, deadline in waiting if deadline <= now]
+                if remaining:
+                    self.pending[id] = remaining
+                else:
+                    del self.pending[id]
+
+        for id, future in expired:
+            if not future.done():
+                future.set_exception(TimeoutError('Transaction %s was not confirmed in time' % id))
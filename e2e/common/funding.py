@@ -0,0 +1,127 @@
+from parse import compile
+from lto.transactions import Association, Lease, MassTransfer, SetScript, Sponsorship, Transfer
+from e2e.common.tools import ROOT_ACCOUNT, broadcast, broadcast_async, convert_balance, generate_account
+
+# Given steps that create a fresh account. Accounts with a fixed private key may already hold funds, so they're
+# not planned.
+NEW_ACCOUNT = [
+    compile('{user} has a new account'),
+    compile('{user} has a new {key_type} account'),
+]
+NEW_ACCOUNT_WITH_BALANCE = [
+    compile('{user} has an account with {balance} lto'),
+    compile('{user} has an {key_type} account with {balance} lto'),
+]
+BALANCE = compile('{user} has {balance} lto')
+
+# Given steps that call `funds_for_transaction` unconditionally for a fresh account.
+FEES = [
+    (compile('{user} has an association with {recipient} of type {type:d}'), Association.BASE_FEE),
+    (compile('{user} has an association with {recipient} of type {type:d} and subject {subject}'),
+     Association.BASE_FEE),
+    (compile('{user} has an association with {recipient} that has data "{key}" with value {value}'),
+     Association.BASE_FEE + Association.VAR_FEE),
+    (compile('{user} is leasing {amount} lto to {recipient}'), Lease.BASE_FEE),
+    (compile('{user} is sponsoring {sponsored}'), Sponsorship.BASE_FEE),
+    (compile('{user} has a smart account with script'), SetScript.BASE_FEE),
+]
+
+
+def _match(patterns, text):
+    return next((result for result in (pattern.parse(text) for pattern in patterns) if result), None)
+
+
+def plan(steps):
+    """
+    Determine which accounts the Given steps will create and how much each account needs: the first balance that is
+    set, plus the fees of the Given steps that fund a transaction.
+    """
+    accounts = {}
+    balances = {}
+    reserved = {}
+    recreated = set()
+
+    for step in steps:
+        if step.step_type != 'given':
+            break
+
+        created = _match(NEW_ACCOUNT_WITH_BALANCE, step.name) or _match(NEW_ACCOUNT, step.name)
+        if created:
+            if created['user'] in accounts:
+                recreated.add(created['user'])
+            accounts[created['user']] = created.named.get('key_type', 'ed25519')
+
+        balance = created if created and 'balance' in created.named else BALANCE.parse(step.name)
+        if balance and balance['user'] in accounts:
+            balances.setdefault(balance['user'], convert_balance(balance['balance']))
+            continue
+
+        for pattern, fee in FEES:
+            result = pattern.parse(step.name)
+            if result and result['user'] in accounts:
+                reserved[result['user']] = reserved.get(result['user'], 0) + fee
+                break
+
+    # Keep it simple for users that get a new account halfway through the scenario; they're funded step by step.
+    for user in recreated:
+        del accounts[user]
+        balances.pop(user, None)
+        reserved.pop(user, None)
+
+    return accounts, balances, reserved
+
+
+def prefund(context, scenario):
+    """
+    Create the accounts of the scenario up front and fund them with a single mass transfer.
+    """
+    accounts, balances, reserved = plan(list(scenario.background_steps or []) + list(scenario.steps))
+
+    context.planned_accounts = {user: (key_type, generate_account(key_type)) for user, key_type in accounts.items()}
+    transfers = [
+        {'recipient': account.address, 'amount': balances.get(user, 0) + reserved.get(user, 0)}
+        for user, (_, account) in context.planned_accounts.items()
+        if balances.get(user, 0) + reserved.get(user, 0) > 0
+    ]
+
+    context.reserved = {user: amount for user, amount in reserved.items() if amount > 0}
+    fund_accounts(context, transfers)
+
+
+def fund_accounts(context, transfers):
+    """
+    Send funds from the root account with as few mass transfers as possible, waiting for all of them at once.
+    """
+    futures = []
+
+    # A mass transfer has at most 100 recipients
+    for i in range(0, len(transfers), 100):
+        transaction = MassTransfer(transfers[i:i + 100])
+        transaction.sign_with(ROOT_ACCOUNT)
+        futures.append(broadcast_async(context, transaction))
+
+    for future in futures:
+        future.result()
+
+
+def planned_account(context, user, key_type):
+    planned = getattr(context, 'planned_accounts', {}).get(user)
+    if planned and planned[0] == key_type:
+        return context.planned_accounts.pop(user)[1]
+    return None
+
+
+def release_reserved_funds(context):
+    """
+    Send reserved funds that weren't used by a Given step back, so balances in When and Then steps are exact. The root
+    account sponsors the transfer, so the fee is paid neither by the user nor by a sponsor of the user.
+    """
+    for user, amount in list(getattr(context, 'reserved', {}).items()):
+        del context.reserved[user]
+        if amount == 0:
+            continue
+
+        transaction = Transfer(ROOT_ACCOUNT.address, amount)
+        transaction.sign_with(context.users[user])
+        transaction.sponsor_with(ROOT_ACCOUNT)
+        broadcast(context, transaction)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+# On-disk pool of pre-generated private keys, so the e2e steps don't have to generate a keypair for every new account.
+#
+# USAGE: python -m e2e.common.keypool refill [--count N] [--key-type TYPE ...] [-j WORKERS]
+#        python -m e2e.common.keypool status
+
+import argparse
+import fcntl
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import base58
+from lto.accounts import AccountFactoryED25519, AccountFactoryECDSA
+
+KEY_TYPES = ['ed25519', 'secp256k1', 'secp256r1']
+RECORD_SIZE = 89  # A base58 encoded 64 byte ed25519 key is at most 88 characters, plus a newline
+
+
+def export_private_key(account):
+    # `create_from_private_key` of an ed25519 factory expects the seed followed by the public key
+    if account.key_type == 'ed25519':
+        key = base58.b58encode(bytes(account.private_key) + bytes(account.public_key))
+    else:
+        key = account.get_private_key()
+    return key.decode() if isinstance(key, bytes) else key
+
+
+def _generate(key_type, count):
+    factory = AccountFactoryED25519('T') if key_type == 'ed25519' else AccountFactoryECDSA('T', key_type)
+    return [export_private_key(factory.create()) for _ in range(count)]
+
+
+class KeyPool:
+    """
+    Keys are stored as fixed size records, one file per key type. A cursor file holds the index of the next unused
+    key, so taking a key is a single seek and read. The cursor is locked, so parallel runs can share the pool.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.taken = Counter()
+        self.missed = Counter()
+
+    def _keys_file(self, key_type):
+        return os.path.join(self.path, '%s.keys' % key_type)
+
+    def _cursor_file(self, key_type):
+        return os.path.join(self.path, '%s.cursor' % key_type)
+
+    def _open_cursor(self, key_type):
+        os.makedirs(self.path, exist_ok=True)
+        f = open(self._cursor_file(key_type), 'a+')
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        return f
+
+    @staticmethod
+    def _read_cursor(f):
+        return int(f.read().strip() or 0)
+
+    @staticmethod
+    def _write_cursor(f, cursor):
+        f.seek(0)
+        f.truncate()
+        f.write(str(cursor))
+        f.flush()
+
+    def _size(self, key_type):
+        try:
+            return os.path.getsize(self._keys_file(key_type)) // RECORD_SIZE
+        except FileNotFoundError:
+            return 0
+
+    def take(self, key_type):
+        if key_type not in KEY_TYPES or self._size(key_type) == 0:
+            self.missed[key_type] += 1
+            return None
+
+        with self._open_cursor(key_type) as cursor_file:
+            cursor = self._read_cursor(cursor_file)
+            if cursor >= self._size(key_type):
+                self.missed[key_type] += 1
+                return None
+
+            with open(self._keys_file(key_type), 'rb') as keys:
+                keys.seek(cursor * RECORD_SIZE)
+                key = keys.read(RECORD_SIZE).decode().strip()
+
+            self._write_cursor(cursor_file, cursor + 1)
+
+        self.taken[key_type] += 1
+        return key
+
+    def available(self, key_type):
+        with self._open_cursor(key_type) as cursor_file:
+            return max(0, self._size(key_type) - self._read_cursor(cursor_file))
+
+    def refill(self, key_type, count, workers=None):
+        """
+        Drop the used keys and top the pool up to `count` unused keys, generating the new keys in a process pool.
+        """
+        with self._open_cursor(key_type) as cursor_file:
+            cursor = self._read_cursor(cursor_file)
+            remaining = []
+            if os.path.exists(self._keys_file(key_type)):
+                with open(self._keys_file(key_type), 'rb') as keys:
+                    keys.seek(cursor * RECORD_SIZE)
+                    remaining = keys.read().decode().split()
+
+            needed = max(0, count - len(remaining))
+            workers = min(workers or os.cpu_count(), max(needed, 1))
+            chunks = [needed // workers + (1 if i < needed % workers else 0) for i in range(workers)]
+
+            generated = []
+            if needed:
+                with ProcessPoolExecutor(workers) as executor:
+                    generated = [key for keys in executor.map(_generate, [key_type] * workers, chunks) for key in keys]
+
+            tmp_file = self._keys_file(key_type) + '.tmp'
+            with open(tmp_file, 'w') as f:
+                f.writelines(key.ljust(RECORD_SIZE - 1) + '\n' for key in remaining + generated)
+            os.replace(tmp_file, self._keys_file(key_type))
+            self._write_cursor(cursor_file, 0)
+
+        return needed
+
+    def report(self):
+        lines = []
+        for key_type in KEY_TYPES:
+            if self.taken[key_type] or self.missed[key_type]:
+                lines.append('%s: %d keys used, %d generated (pool empty), %d left' % (
+                    key_type, self.taken[key_type], self.missed[key_type], self.available(key_type)
+                ))
+        return lines
+
+
+if __name__ == '__main__':
+    from e2e.common import config
+
+    parser = argparse.ArgumentParser(description='Manage the pool of pre-generated keys for the e2e tests')
+    parser.add_argument('command', choices=['refill', 'status'])
+    parser.add_argument('--count', type=int, default=1000, help='Number of unused keys per key type after refill')
+    parser.add_argument('--key-type', action='append', choices=KEY_TYPES, help='Key type (default: all)')
+    parser.add_argument('-j', '--workers', type=int, help='Number of processes used to generate keys')
+    options = parser.parse_args()
+
+    pool = KeyPool(config.key_pool)
+    for key_type in options.key_type or KEY_TYPES:
+        if options.command == 'refill':
+            generated = pool.refill(key_type, options.count, options.workers)
+            print('%s: generated %d keys' % (key_type, generated))
+        print('%s: %d keys available' % (key_type, pool.available(key_type)))
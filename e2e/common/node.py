@@ -2,8 +2,19 @@ import subprocess
 import polling
 import requests
 import os
+from time import monotonic, time
+from urllib.parse import urlparse
 
 from e2e.common import config
+from e2e.common.memory_node import MemoryNode
+from e2e.common.tools import ROOT_ACCOUNT
+
+# The last block must be recent for the node to count as generating blocks (the custom network has a 1s block delay)
+MAX_BLOCK_AGE = 30
+
+GENESIS_BALANCE = 1000000000 * 100000000
+
+MEMORY_NODE = None
 
 
 def header():
@@ -11,25 +22,54 @@ def header():
 
 
 def stop_node():
+    global MEMORY_NODE
+    if config.node == 'memory':
+        if MEMORY_NODE:
+            MEMORY_NODE.stop()
+            MEMORY_NODE = None
+        return
+
     dir_path = os.path.dirname(os.path.realpath(__file__))
     subprocess.run(dir_path + "/../bin/stop_public_node", shell=True, check=True)
 
 
-def start_node():
+def start_memory_node():
+    global MEMORY_NODE
+    port = urlparse(config.node_url).port
+    MEMORY_NODE = MemoryNode(port, {ROOT_ACCOUNT.address: GENESIS_BALANCE}).start()
+
+
+def start_node(timeout=60):
     dir_path = os.path.dirname(os.path.realpath(__file__))
-    subprocess.run(dir_path + "/../bin/run_public_node", shell=True, check=True)
 
+    start = monotonic()
+    if config.node == 'memory':
+        start_memory_node()
+    else:
+        subprocess.run(dir_path + "/../bin/run_public_node", shell=True, check=True)
+    started = monotonic()
+    ready = is_node_up(timeout)
+    end = monotonic()
 
-def is_node_up(timeout=1):
-  try:
-    polling.poll(_ping_node, step=1, timeout=timeout)
-    return True
-  except:
-    return False
+    if ready:
+        print('Node up in %.1fs (start %.1fs, ready %.1fs)' % (end - start, started - start, end - started))
+    elif config.node != 'memory':
+        subprocess.run(['docker', 'logs', 'lto_public_node_e2e'])
+    return ready
 
-def _ping_node():
-  try:
-    return requests.get(config.node_url + "/", headers=header(), timeout=2).status_code == 200
-  except:
-    return False
 
+def is_node_up(timeout=1, step=0.1):
+    try:
+        polling.poll(_ping_node, step=step, timeout=timeout)
+        return True
+    except polling.TimeoutException:
+        return False
+
+
+def _ping_node():
+    # Ready once the node serves the API and is generating blocks on top of the genesis block
+    try:
+        status = requests.get(config.node_url + "/node/status", headers=header(), timeout=1).json()
+        return status['blockchainHeight'] > 1 and time() - status['updatedTimestamp'] / 1000 < MAX_BLOCK_AGE
+    except (requests.RequestException, ValueError, KeyError):
+        return False
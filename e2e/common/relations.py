@@ -0,0 +1,142 @@
+import threading
+
+TYPES = {
+    'lease': 8, 'cancel-lease': 9, 'association': 16, 'revoke-association': 17, 'sponsorship': 18,
+    'cancel-sponsorship': 19,
+}
+
+
+class RelationCache:
+    """
+    Associations, active leases and sponsorships per address, as returned by the node. Entries are fetched once and
+    then kept up to date with the transactions that the harness broadcasts itself. An address is fetched again when a
+    confirmed transaction that wasn't broadcast by the harness touches it.
+
+    Only the preconditions of Given steps (is Alice already leasing to Bob?) are read from the cache. The checks after
+    a Given step broadcasts and the Then steps pass `fresh=True`, so the outcome of a scenario is always checked
+    against the node itself.
+
+    Unexpected transactions are only noticed while the confirmation tracker is scanning blocks, so the cache assumes
+    that the accounts of a scenario are only used by that scenario.
+    """
+
+    def __init__(self, node):
+        self.node = node
+        self.lock = threading.Lock()
+        self.associations = {}
+        self.leases = {}
+        self.sponsors = {}
+        self.expected = set()
+
+    def get_associations(self, address, fresh=False):
+        with self.lock:
+            if address in self.associations and not fresh:
+                return self.associations[address]
+        associations = self.node.request('/associations/status/{}'.format(address))
+        with self.lock:
+            self.associations[address] = associations
+            return associations
+
+    def get_leases(self, address, fresh=False):
+        with self.lock:
+            if address in self.leases and not fresh:
+                return self.leases[address]
+        leases = self.node.lease_list(address)
+        with self.lock:
+            self.leases[address] = leases
+            return leases
+
+    def get_sponsors(self, address, fresh=False):
+        with self.lock:
+            if address in self.sponsors and not fresh:
+                return self.sponsors[address]
+        sponsors = self.node.sponsorship_list(address)
+        with self.lock:
+            self.sponsors[address] = sponsors
+            return sponsors
+
+    def add_new_account(self, address):
+        # A freshly generated account has no transactions, so there's nothing to fetch
+        with self.lock:
+            self.associations[address] = {'address': address, 'outgoing': [], 'incoming': []}
+            self.leases[address] = []
+            self.sponsors[address] = {'sponsor': []}
+
+    def expect(self, transaction):
+        # Called before the harness broadcasts a transaction, so it's not mistaken for an unexpected one. The id isn't
+        # known yet, but the signature is just as unique. Blocks can be scanned more than once, so it's kept after the
+        # transaction is confirmed.
+        with self.lock:
+            self.expected.add(transaction.proofs[0])
+
+    def abandon(self, transaction):
+        # Called when a transaction of the harness is rejected or isn't confirmed in time. Should it be confirmed after
+        # all, it's treated as an unexpected transaction.
+        with self.lock:
+            self.expected.discard(transaction.proofs[0])
+
+    def seen(self, tx):
+        """
+        Listener for every transaction in a scanned block.
+        """
+        with self.lock:
+            if tx.get('proofs') and tx['proofs'][0] in self.expected:
+                return
+
+            addresses = {tx.get('sender'), tx.get('recipient')}
+            addresses.update(transfer['recipient'] for transfer in tx.get('transfers', []))
+            for address in addresses - {None}:
+                self.associations.pop(address, None)
+                self.leases.pop(address, None)
+                self.sponsors.pop(address, None)
+
+    def confirmed(self, tx):
+        """
+        Apply a confirmed transaction of the harness to the cached entries.
+        """
+        with self.lock:
+            if tx['type'] == TYPES['association']:
+                self._associate(tx)
+            elif tx['type'] == TYPES['revoke-association']:
+                self._revoke(tx)
+            elif tx['type'] == TYPES['lease']:
+                for address in (tx['sender'], tx['recipient']):
+                    if address in self.leases:
+                        self.leases[address] = self.leases[address] + [tx]
+            elif tx['type'] == TYPES['cancel-lease']:
+                for address, leases in self.leases.items():
+                    self.leases[address] = [lease for lease in leases if lease['id'] != tx['leaseId']]
+            elif tx['type'] == TYPES['sponsorship'] and tx['recipient'] in self.sponsors:
+                sponsors = self.sponsors[tx['recipient']]['sponsor']
+                self.sponsors[tx['recipient']] = {'sponsor': [tx['sender']] + sponsors}
+            elif tx['type'] == TYPES['cancel-sponsorship'] and tx['recipient'] in self.sponsors:
+                sponsors = self.sponsors[tx['recipient']]['sponsor']
+                self.sponsors[tx['recipient']] = {'sponsor': [s for s in sponsors if s != tx['sender']]}
+
+    def _associate(self, tx):
+        association = {
+            'sender': tx['sender'],
+            'type': tx['associationType'],
+            'recipient': tx['recipient'],
+            'subject': tx.get('subject'),
+            'timestamp': tx['timestamp'],
+            'expires': tx.get('expires'),
+            'data': tx.get('data') or [],
+        }
+        self._update_associations(tx, lambda associations: associations + [association])
+
+    def _revoke(self, tx):
+        self._update_associations(tx, lambda associations: associations)
+
+    def _update_associations(self, tx, update):
+        # An association is identified by its type, recipient and subject; issuing it again replaces it
+        def other(association):
+            return (association['type'], association['recipient'], association.get('subject')) != \
+                (tx['associationType'], tx['recipient'], tx.get('subject'))
+
+        for address, direction in ((tx['sender'], 'outgoing'), (tx['recipient'], 'incoming')):
+            if address not in self.associations:
+                continue
+            status = dict(self.associations[address])
+            status[direction] = update([a for a in status[direction] if other(a) or a['sender'] != tx['sender']])
+            self.associations[address] = status
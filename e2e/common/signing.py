@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from lto import crypto
+from lto.accounts import AccountFactoryED25519, AccountFactoryECDSA
+from e2e.common.keypool import export_private_key
+
+
+@lru_cache(maxsize=None)
+def _account(key_type, private_key, chain_id):
+    factory = AccountFactoryED25519(chain_id) if key_type == 'ed25519' else AccountFactoryECDSA(chain_id, key_type)
+    return factory.create_from_private_key(private_key)
+
+
+def _sign_chunk(key, transactions):
+    account = _account(*key)
+    for transaction in transactions:
+        transaction.sign_with(account)
+    return transactions
+
+
+def sign_all(transactions, account, workers=None, chunk_size=50):
+    """
+    Sign a large list of transactions with the account, spread over a process pool. Accounts can't be pickled, so
+    the workers recreate the account from its private key once per process.
+    """
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(transactions) <= chunk_size:
+        for transaction in transactions:
+            transaction.sign_with(account)
+        return list(transactions)
+
+    key = _key(account)
+    chunks = [transactions[i:i + chunk_size] for i in range(0, len(transactions), chunk_size)]
+
+    with ProcessPoolExecutor(workers) as executor:
+        return [tx for chunk in executor.map(_sign_chunk, [key] * len(chunks), chunks) for tx in chunk]
+
+
+def _key(account):
+    return account.key_type, export_private_key(account), crypto.get_network(account.address)
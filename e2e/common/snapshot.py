@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+from e2e.common import config, trace
+
+WORKERS = 16
+
+_session = requests.Session()
+_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=WORKERS))
+_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=WORKERS))
+_executor = ThreadPoolExecutor(WORKERS, thread_name_prefix='snapshot')
+
+
+def _get(endpoint):
+    response = _session.get(config.node_url + endpoint, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def _fetch(address, data):
+    state = {'balance': _get('/addresses/balance/details/%s' % address)}
+    if data:
+        state['data'] = {entry['key']: entry['value'] for entry in _get('/addresses/data/%s' % address)}
+    return state
+
+
+def take_snapshot(addresses, data=False, retries=3):
+    """
+    Fetch the balance details (regular, available, effective and generating) and optionally the data of all addresses
+    at once, with concurrent requests over pooled connections. The snapshot is consistent if the height didn't change
+    while fetching; otherwise it's taken again, up to `retries` times.
+    """
+    addresses = list(dict.fromkeys(addresses))
+
+    with trace.phase('http'):
+        for attempt in range(retries + 1):
+            height = _get('/blocks/height')['height']
+            states = list(_executor.map(lambda address: _fetch(address, data), addresses))
+            consistent = _get('/blocks/height')['height'] == height
+            if consistent:
+                break
+
+    return {
+        'height': height,
+        'consistent': consistent,
+        'accounts': dict(zip(addresses, states)),
+    }
@@ -0,0 +1,107 @@
+import fcntl
+import json
+import os
+from statistics import median
+
+# Enabled by default; set with `behave -D timings=FILE` or the `LTO_E2E_TIMINGS` env var, an empty value disables it
+HISTORY = None
+
+KEEP = 20          # Runs kept per scenario
+MIN_RUNS = 5       # Runs needed before a scenario is checked
+THRESHOLD = 3.5    # Modified z-score above which a timing counts as a regression
+MIN_SPREAD = 0.05  # Relative to the median, so a scenario with a very stable history isn't flagged for jitter
+MIN_SPREAD_SECONDS = 0.01  # Likewise for the sub-second timings of the memory node
+MAD_SCALE = 1.4826  # Scales the median absolute deviation to the standard deviation of a normal distribution
+
+
+def normalized(duration, blocks):
+    # Seconds per block waited. A scenario that doesn't wait for any block is compared by its duration.
+    return duration / max(blocks, 1)
+
+
+def modified_z_score(value, history):
+    """
+    Distance of the value to the median of the history, in (scaled) median absolute deviations. Unlike the mean and
+    standard deviation, the median and MAD aren't thrown off by an earlier run that was slow for unrelated reasons.
+    """
+    center = median(history)
+    spread = max(MAD_SCALE * median(abs(x - center) for x in history), MIN_SPREAD * center, MIN_SPREAD_SECONDS)
+    return (value - center) / spread
+
+
+class TimingHistory:
+    """
+    Duration of every passed scenario and feature per run, normalized by the number of blocks that the scenario waited
+    for. Blocks are counted as the distinct heights at which the transactions of the scenario were confirmed, so
+    transactions that are awaited together count once. Entries are keyed by node type, as the memory node and a real
+    node aren't comparable.
+
+    The file is locked and merged on write, so parallel workers can share it.
+    """
+
+    def __init__(self, path, node):
+        self.path = path
+        self.node = node
+        self.history = self._load()
+        self.current = {}
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _key(self, kind, *names):
+        return '%s:%s:%s' % (self.node, kind, ' > '.join(names))
+
+    def record_scenario(self, feature, scenario, duration, blocks):
+        self.current[self._key('scenario', feature, scenario)] = {
+            'duration': round(duration, 3), 'blocks': blocks, 'normalized': round(normalized(duration, blocks), 4),
+        }
+
+    def record_feature(self, feature, duration, blocks):
+        self.current[self._key('feature', feature)] = {
+            'duration': round(duration, 3), 'blocks': blocks, 'normalized': round(normalized(duration, blocks), 4),
+        }
+
+    def regressions(self):
+        """
+        Timings of this run that are significantly worse than the recent history, worst first.
+        """
+        found = []
+        for key, entry in self.current.items():
+            history = [run['normalized'] for run in self.history.get(key, [])]
+            if len(history) < MIN_RUNS:
+                continue
+            score = modified_z_score(entry['normalized'], history)
+            if score > THRESHOLD:
+                found.append((score, key.split(':', 2)[2], entry, median(history)))
+        return sorted(found, key=lambda r: -r[0])
+
+    def report(self):
+        lines = []
+        for score, name, entry, typical in self.regressions():
+            lines.append('  %.2fs per block (median %.2fs, z %.1f, %.1fs over %d blocks)  %s' % (
+                entry['normalized'], typical, score, entry['duration'], entry['blocks'], name
+            ))
+        return ['Timing regressions:'] + lines if lines else []
+
+    def write(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            history = self._load()
+            for key, entry in self.current.items():
+                history[key] = (history.get(key, []) + [entry])[-KEEP:]
+
+            tmp_file = self.path + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(history, f, indent=1, sort_keys=True)
+            os.replace(tmp_file, self.path)
+
+
+def enable(path, node):
+    global HISTORY
+    HISTORY = TimingHistory(path, node)
+    return HISTORY
@@ -1,16 +1,22 @@
 from lto.accounts import AccountFactoryED25519 as AccountFactory, AccountFactoryECDSA
 from lto.public_node import PublicNode
 from lto.transactions import Transfer
-import polling
-import requests
+from concurrent.futures import Future
 import hashlib
-from e2e.common import config
+from e2e.common import config, trace
+from e2e.common.confirmation import ConfirmationTracker
+from e2e.common.keypool import KeyPool
+from e2e.common.snapshot import take_snapshot
+from e2e.common.tx_index import TransactionIndex
 
 CHAIN_ID = config.chain_id
 URL = config.node_url
 NODE = PublicNode(URL)
 ROOT_SEED = config.seed
 ROOT_ACCOUNT = AccountFactory(CHAIN_ID).create_from_seed(ROOT_SEED)
+TRACKER = ConfirmationTracker(URL)
+KEY_POOL = KeyPool(config.key_pool)
+TX_INDEX = TransactionIndex(NODE)
 
 
 def assert_equals(value1, value2):
@@ -20,6 +26,9 @@ def assert_equals(value1, value2):
 def generate_account(key_type='ed25519', private_key=None):
     factory = AccountFactory(CHAIN_ID) if key_type == 'ed25519' else AccountFactoryECDSA(CHAIN_ID, key_type)
 
+    if not private_key:
+        private_key = KEY_POOL.take(key_type)
+
     if private_key:
         return factory.create_from_private_key(private_key)
     else:
@@ -34,7 +43,25 @@ def get_data(address):
     return NODE.data(address)
 
 
+def snapshot_balance(context, user):
+    # Consecutive Then steps share one snapshot of all users, which is dropped by the next broadcast
+    address = context.users[user].address
+    snapshot = getattr(context, 'snapshot', None)
+    if snapshot is None or address not in snapshot['accounts']:
+        snapshot = take_snapshot(account.address for account in context.users.values())
+        context.snapshot = snapshot
+    return snapshot['accounts'][address]['balance']['regular']
+
+
+def reserved_funds(context, user):
+    return getattr(context, 'reserved', {}).get(user, 0)
+
+
 def funds_for_transaction(context, user, tx_fee):
+    if reserved_funds(context, user) >= tx_fee:
+        context.reserved[user] -= tx_fee  # Funded up front by the funding planner
+        return
+
     account = context.users[user]
     transaction = Transfer(account.address, tx_fee)
     transaction.sign_with(ROOT_ACCOUNT)
@@ -43,28 +70,70 @@ def funds_for_transaction(context, user, tx_fee):
 
 def minimum_balance(context, user, amount):
     account = context.users[user]
-    balance = get_balance(account.address)
+    balance = get_balance(account.address) - reserved_funds(context, user)
     if balance < amount:
         transaction = Transfer(account.address, amount - balance)
         transaction.sign_with(ROOT_ACCOUNT)
         broadcast(context, transaction)
 
 
+def waited_for(context, *heights):
+    # Blocks that the scenario waited for, counted by the timing history
+    if getattr(context, 'confirmed_heights', None) is not None:
+        context.confirmed_heights.update(heights)
+
+
 def poll_tx(context, id):
-    context.tx_ids.append(id)
-    response = polling.poll(
-        lambda: requests.get('%s%s' % (URL, ('/transactions/info/%s' % id)), headers='').json(),
-        check_success=lambda response: 'id' in response,
-        step=0.1,
-        timeout=180
-    )
-    return response
+    # The id is recorded in context.tx_ids when it's broadcast (see broadcast_async), not here
+    with trace.phase('wait'):
+        return TRACKER.wait(id)
 
 
-def broadcast(context, transaction):
+def broadcast_async(context, transaction):
+    context.snapshot = None
+
+    relations = getattr(context, 'relations', None)
+    if relations:
+        relations.expect(transaction)
+    heights = getattr(context, 'confirmed_heights', None)
+
     try:
         tx = transaction.broadcast_to(NODE)
-        poll_tx(context, tx.id)
+    except Exception:
+        if relations:
+            relations.abandon(transaction)
+        raise
+    context.tx_ids.append(tx.id)
+
+    future = Future()
+
+    def confirmed(watched):
+        if watched.exception():
+            if relations:
+                relations.abandon(transaction)
+            future.set_exception(watched.exception())
+            return
+
+        try:
+            if relations:
+                relations.confirmed(watched.result())
+            tx.height = watched.result()['height']
+            if heights is not None:
+                heights.add(tx.height)
+        except Exception as e:
+            future.set_exception(e)  # Exceptions of a done callback are swallowed, so the future must carry it
+        else:
+            future.set_result(tx)
+
+    TRACKER.watch(tx.id).add_done_callback(confirmed)
+    return future
+
+
+def broadcast(context, transaction):
+    try:
+        future = broadcast_async(context, transaction)
+        with trace.phase('wait'):
+            tx = future.result(TRACKER.result_timeout())
         context.last_tx_success = True
         return tx
     except:
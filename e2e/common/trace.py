@@ -0,0 +1,134 @@
+import json
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from time import monotonic
+from lto.transaction import Transaction
+
+# Enabled with `behave -D trace=FILE` or the `LTO_E2E_TRACE` env var. When disabled, `phase()` does nothing.
+TRACE = None
+
+PHASES = ['sign', 'http', 'wait', 'sleep']
+
+
+def _endpoint(path):
+    # Group requests by endpoint, replacing addresses, ids and numbers with a placeholder
+    path = path.split('?')[0]
+    return '/'.join(
+        '{n}' if part.isdigit() else '{id}' if len(part) > 20 else part
+        for part in path.split('/')
+    )
+
+
+class Trace:
+    def __init__(self, path):
+        self.path = path
+        self.steps = []
+        self.stack = []  # Steps can execute nested steps
+        self.endpoints = defaultdict(list)
+        self.main_thread = threading.current_thread()
+
+    def start_step(self, feature, scenario, step):
+        self.stack.append({
+            'feature': feature,
+            'scenario': scenario,
+            'step': step,
+            'depth': len(self.stack),
+            'start': monotonic(),
+            'phases': defaultdict(float),
+            'requests': [],
+        })
+
+    def end_step(self, status):
+        if not self.stack:
+            return
+
+        record = self.stack.pop()
+        record['duration'] = monotonic() - record.pop('start')
+        record['status'] = status
+        self.steps.append(record)
+
+        if self.stack:
+            for name, duration in record['phases'].items():
+                self.stack[-1]['phases'][name] += duration
+        record['phases']['other'] = max(0.0, record['duration'] - sum(record['phases'].values()))
+
+    def record(self, phase, duration, endpoint=None):
+        # Work done outside of steps (hooks) or by background threads isn't part of a step
+        if not self.stack or threading.current_thread() is not self.main_thread:
+            return
+
+        self.stack[-1]['phases'][phase] += duration
+        if endpoint:
+            self.stack[-1]['requests'].append([endpoint, duration])
+            self.endpoints[endpoint].append(duration)
+
+    def install(self, node):
+        request = node.request
+        sign_with = Transaction.sign_with
+        sponsor_with = Transaction.sponsor_with
+
+        def traced_request(endpoint, *args, **kwargs):
+            start = monotonic()
+            try:
+                return request(endpoint, *args, **kwargs)
+            finally:
+                self.record('http', monotonic() - start, _endpoint(endpoint))
+
+        def traced_sign(transaction, account):
+            with phase('sign'):
+                return sign_with(transaction, account)
+
+        def traced_sponsor(transaction, account):
+            with phase('sign'):
+                return sponsor_with(transaction, account)
+
+        node.request = traced_request
+        Transaction.sign_with = traced_sign
+        Transaction.sponsor_with = traced_sponsor
+
+    def write(self):
+        with open(self.path, 'w') as f:
+            json.dump({'steps': self.steps, 'endpoints': self.endpoints}, f, indent=2)
+
+    def summary(self, limit=10):
+        steps = [record for record in self.steps if record['depth'] == 0]
+
+        lines = ['Slowest steps:']
+        for record in sorted(steps, key=lambda r: -r['duration'])[:limit]:
+            phases = ', '.join('%s %.2fs' % (p, record['phases'][p]) for p in PHASES + ['other'] if record['phases'][p])
+            lines.append('  %6.2fs  %s > %s (%s)' % (record['duration'], record['scenario'], record['step'], phases))
+
+        totals = defaultdict(float)
+        for record in steps:
+            for name, duration in record['phases'].items():
+                totals[name] += duration
+        lines.append('Time per phase: ' + ', '.join('%s %.1fs' % (p, totals[p]) for p in PHASES + ['other']))
+
+        lines.append('Slowest endpoints (total):')
+        for endpoint, durations in sorted(self.endpoints.items(), key=lambda e: -sum(e[1]))[:limit]:
+            lines.append('  %6.2fs  %5d requests  avg %4.0fms  %s' % (
+                sum(durations), len(durations), sum(durations) / len(durations) * 1000, endpoint
+            ))
+
+        return lines
+
+
+def enable(path, node):
+    global TRACE
+    TRACE = Trace(path)
+    TRACE.install(node)
+    return TRACE
+
+
+@contextmanager
+def phase(name):
+    if TRACE is None:
+        yield
+        return
+
+    start = monotonic()
+    try:
+        yield
+    finally:
+        TRACE.record(name, monotonic() - start)
@@ -0,0 +1,72 @@
+from lto.transactions import from_data
+
+PAGE_SIZE = 100
+
+
+class TransactionIndex:
+    """
+    Client side index of the transactions of an address, per transaction type. A refresh only fetches the transactions
+    that are newer than the last one seen, and the lookups by anchor hash, mapped anchor key and statement data key are
+    dictionary lookups instead of a scan of the whole history.
+    """
+
+    def __init__(self, node, page_size=PAGE_SIZE):
+        self.node = node
+        self.page_size = page_size
+        self.entries = {}
+
+    def _fetch_new(self, address, tx_type, latest):
+        # The node returns the newest transactions first; page back until the last transaction that was seen.
+        new = []
+        offset = 0
+        while True:
+            page = self.node.request('/transactions/address/%s?type=%s&limit=%d&offset=%d' % (
+                address, tx_type, self.page_size, offset
+            ))[0]
+
+            for data in page:
+                if data['id'] == latest:
+                    return new
+                new.append(data)
+
+            if len(page) < self.page_size:
+                return new
+            offset += len(page)
+
+    def refresh(self, address, tx_type):
+        entry = self.entries.setdefault((address, tx_type), {'latest': None, 'count': 0, 'index': {}})
+        new = self._fetch_new(address, tx_type, entry['latest'])
+        if not new:
+            return entry['index']
+
+        # Apply the oldest first, so the newest transaction wins for keys that are used more than once
+        for data in reversed(new):
+            tx = from_data(data)
+            for key, value in _index_items(tx_type, tx):
+                entry['index'][key] = value
+
+        entry['latest'] = new[0]['id']
+        entry['count'] += len(new)
+        return entry['index']
+
+    def anchor(self, address, hash):
+        """Anchor transaction with the (base58 encoded) hash."""
+        return self.refresh(address, 'anchor').get(hash)
+
+    def mapped_anchor(self, address, key):
+        """Value of the (raw) key in the latest mapped anchor transaction that has the key."""
+        return self.refresh(address, 'mapped-anchor').get(key)
+
+    def statement_data(self, address, key):
+        """Value of the data key in the latest statement transaction that has the key."""
+        return self.refresh(address, 'statement').get(key)
+
+
+def _index_items(tx_type, tx):
+    if tx_type == 'anchor':
+        return [(anchor.base58(), tx) for anchor in tx.anchors]
+    if tx_type == 'mapped-anchor':
+        return [(bytes(key), value) for key, value in tx.anchors.items()]
+    if tx_type == 'statement':
+        return [(entry.key, entry.value) for entry in tx.data or []]
+    raise ValueError('No index for %s transactions' % tx_type)
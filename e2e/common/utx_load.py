@@ -0,0 +1,203 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from statistics import median
+from time import monotonic
+import requests
+
+from e2e.common.tools import URL, TRACKER
+
+SAMPLE_INTERVAL = 0.2
+POOL_FULL = 'Transaction pool size limit is reached'  # UtxPoolImpl.putIfNew
+
+
+def overtaken(records, backlog, height):
+    """
+    Pairs of a record and a record of the backlog that was broadcast before it, but was confirmed in an earlier block.
+    Only blocks after `height` count, as the records were all in the pool when those blocks were forged.
+    """
+    return [
+        (record, earlier)
+        for record in records
+        for earlier in backlog
+        if earlier['sent'] < record['sent'] and earlier['height'] is not None and
+        height < earlier['height'] < (record['height'] or float('inf'))
+    ]
+
+
+class PoolSampler:
+    """
+    Samples the size of the unconfirmed pool and the height in a background thread, from `start()` until `stop()`.
+    """
+
+    def __init__(self, start, interval=SAMPLE_INTERVAL):
+        self.start_time = start
+        self.interval = interval
+        self.session = requests.Session()
+        self.samples = []
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _get(self, endpoint):
+        response = self.session.get(URL + endpoint, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def sample(self):
+        try:
+            size = self._get('/transactions/unconfirmed/size')['size']
+            height = self._get('/blocks/height')['height']
+        except requests.RequestException:
+            return None  # The node might be too busy to respond; that shows as a gap in the time series
+
+        sample = {'time': monotonic() - self.start_time, 'size': size, 'height': height}
+        self.samples.append(sample)
+        return sample
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='pool-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+
+
+class LoadRun:
+    """
+    Broadcasts presigned transactions as fast as a number of concurrent clients can, without waiting for blocks, and
+    keeps a record of every broadcast: when it was sent, the latency, the response and, for accepted transactions, the
+    height at which it was confirmed. The size of the unconfirmed pool is sampled for the whole run.
+    """
+
+    def __init__(self, concurrency=32):
+        self.concurrency = concurrency
+        self.start = monotonic()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.records = []
+        self.stop_at = None
+        self.sampler = PoolSampler(self.start)
+        self.sampler.start()
+
+    def _session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def _send(self, transaction, label, stop_on):
+        if stop_on and self.stop_at is not None:
+            return
+
+        body = json.dumps(transaction.to_json())
+        sent = monotonic()
+        record = {'label': label, 'fee': transaction.tx_fee, 'sent': sent - self.start}
+        try:
+            response = self._session().post(URL + '/transactions/broadcast', data=body,
+                                            headers={'content-type': 'application/json'}, timeout=30)
+            record['status'] = response.status_code
+            result = response.json()
+        except (requests.RequestException, ValueError) as e:
+            record['status'] = None
+            result = {'message': type(e).__name__}
+        record['latency'] = monotonic() - sent
+
+        if record['status'] == 200:
+            record['id'] = result['id']
+            record['confirmed'] = TRACKER.watch(result['id'])
+        else:
+            record['error'] = result.get('error')
+            record['message'] = result.get('message')
+            if stop_on and stop_on in (record['message'] or ''):
+                self.stop_at = monotonic() - self.start
+
+        with self.lock:
+            self.records.append(record)
+
+    def broadcast(self, transactions, label='normal', stop_on=None):
+        """
+        Broadcast the transactions concurrently. With `stop_on`, broadcasting stops at the first rejection with a
+        message that contains it.
+        """
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            for transaction in transactions:
+                executor.submit(self._send, transaction, label, stop_on)
+
+    def accepted(self, label=None):
+        return [r for r in self.records if r['status'] == 200 and label in (None, r['label'])]
+
+    def rejected(self, label=None):
+        return [r for r in self.records if r['status'] != 200 and label in (None, r['label'])]
+
+    def confirmed(self, label=None, timeout=None):
+        """
+        Wait for the accepted transactions and return their records with the confirmation height, or None if it timed
+        out.
+        """
+        confirmed = []
+        for record in self.accepted(label):
+            try:
+                height = record['confirmed'].result(timeout)['height']
+            except Exception:
+                height = None
+            confirmed.append(dict(record, height=height))
+        return confirmed
+
+    def heights(self, label=None, timeout=None):
+        return [record['height'] for record in self.confirmed(label, timeout)]
+
+    def stop(self):
+        self.sampler.stop()
+
+    def time_series(self, bucket=1.0):
+        """
+        Broadcasts, rejections, latency and the pool size per bucket of `bucket` seconds.
+        """
+        count = int(max([r['sent'] for r in self.records] + [s['time'] for s in self.sampler.samples] + [0]) / bucket)
+        rows = []
+        for i in range(count + 1):
+            records = [r for r in self.records if i <= r['sent'] / bucket < i + 1]
+            samples = [s for s in self.sampler.samples if i <= s['time'] / bucket < i + 1]
+            latency = sorted(r['latency'] for r in records)
+            rows.append({
+                'time': i * bucket,
+                'sent': len(records),
+                'rejected': sum(1 for r in records if r['status'] != 200),
+                'latency_p50': median(latency) if latency else None,
+                'latency_max': latency[-1] if latency else None,
+                'pool': max(s['size'] for s in samples) if samples else None,
+                'height': samples[-1]['height'] if samples else None,
+            })
+        return rows
+
+    def report(self):
+        lines = ['      %6s %6s %8s %8s %8s %7s %7s' % ('time', 'sent', 'rejected', 'p50 ms', 'max ms', 'pool',
+                                                       'height')]
+        for row in self.time_series():
+            lines.append('      %5.0fs %6d %8d %8s %8s %7s %7s' % (
+                row['time'], row['sent'], row['rejected'],
+                '-' if row['latency_p50'] is None else '%.0f' % (row['latency_p50'] * 1000),
+                '-' if row['latency_max'] is None else '%.0f' % (row['latency_max'] * 1000),
+                '-' if row['pool'] is None else row['pool'], '-' if row['height'] is None else row['height'],
+            ))
+
+        reasons = {}
+        for record in self.rejected():
+            reason = '%s %s' % (record['error'], record['message'])
+            reasons[reason] = reasons.get(reason, 0) + 1
+        for reason, count in sorted(reasons.items(), key=lambda r: -r[1]):
+            lines.append('      rejected %5d  %s' % (count, reason))
+
+        return lines
+
+    def to_json(self):
+        return {
+            'records': [{key: value for key, value in r.items() if key != 'confirmed'} for r in self.records],
+            'samples': self.sampler.samples,
+            'time_series': self.time_series(),
+        }
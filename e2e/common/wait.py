@@ -0,0 +1,58 @@
+from time import monotonic, sleep
+from e2e.common.tools import NODE, TRACKER, get_balance, get_data
+
+
+def wait_until(condition, timeout=60, interval=0.05, max_interval=1.0, message='Condition not met'):
+    """
+    Poll until the condition returns a truthy value, backing off while nothing changes. The interval is reset whenever
+    a new block is seen, because that's when the state is most likely to change.
+    """
+    deadline = monotonic() + timeout
+    delay = interval
+    height = None
+
+    while True:
+        result = condition()
+        if result:
+            return result
+
+        if monotonic() + delay > deadline:
+            raise TimeoutError('%s after %ds' % (message, timeout))
+        sleep(delay)
+
+        current = NODE.height()
+        delay = interval if current != height else min(delay * 2, max_interval)
+        height = current
+
+
+def wait_for_height(height, timeout=60, interval=0.05, max_interval=1.0):
+    deadline = monotonic() + timeout
+    delay = interval
+
+    while True:
+        current = NODE.height()
+        if current >= height:
+            return current
+
+        if monotonic() + delay > deadline:
+            raise TimeoutError('Height %d not reached after %ds' % (height, timeout))
+        sleep(delay)
+        delay = min(delay * 2, max_interval)
+
+
+def wait_for_blocks(count=1, timeout=60):
+    return wait_for_height(NODE.height() + count, timeout)
+
+
+def wait_for_tx(id, timeout=180):
+    return TRACKER.wait(id, timeout)
+
+
+def wait_for_balance(address, expected, timeout=60):
+    return wait_until(lambda: get_balance(address) == expected, timeout,
+                      message='Balance of %s is not %d' % (address, expected))
+
+
+def wait_for_data(address, key, expected, timeout=60):
+    return wait_until(lambda: get_data(address).get(key) == expected, timeout,
+                      message='Data "%s" of %s is not %s' % (key, address, expected))
@@ -1,38 +1,133 @@
+import json
+import os
+from time import monotonic
 from e2e.common import node
 from behave.model_core import Status
-from e2e.common.tools import get_balance
+from e2e.common.tools import KEY_POOL, NODE, TRACKER
+from e2e.common.relations import RelationCache
+from e2e.common.snapshot import take_snapshot
+from e2e.common import config, funding, timings, trace
 
 
 def before_all(context):
+    trace_file = context.config.userdata.get('trace', os.environ.get('LTO_E2E_TRACE'))
+    if trace_file:
+        trace.enable(trace_file, NODE)
+
+    config.node = context.config.userdata.get('node', config.node)
+
+    timings_file = context.config.userdata.get('timings', config.timings)
+    if timings_file:
+        timings.enable(timings_file, config.node)
+
     context.started_node = False
     if not node.is_node_up():
-        node.start_node()
         context.started_node = True
-        assert node.is_node_up(30), "Unable to connect to node"
+        assert node.start_node(), "Unable to connect to node"
+
+    context.relations = RelationCache(NODE)
+    TRACKER.subscribe(context.relations.seen)
 
 
 def after_all(context):
     if context.started_node:
         node.stop_node()
 
+    for line in KEY_POOL.report():
+        print('Key pool %s' % line)
+
+    if trace.TRACE:
+        trace.TRACE.write()
+        print('\n'.join(trace.TRACE.summary()))
+
+    if timings.HISTORY:
+        timings.HISTORY.write()
+        for line in timings.HISTORY.report():
+            print(line)
+
 
 def before_feature(context, feature):
     context.users = {}
     context.tx_ids = []
     context.last_tx_success = None
+    context.feature_heights = set()
+    context.feature_start = monotonic()
+
+
+def after_feature(context, feature):
+    if timings.HISTORY and feature.status == Status.passed:
+        timings.HISTORY.record_feature(feature.name, monotonic() - context.feature_start, len(context.feature_heights))
+
+
+def load_selected(context):
+    # The @load scenarios are heavy, so they only run when selected with `--tags=@load`
+    return any('load' in tags for tags in context.config.tags.ands)
+
+
+def before_scenario(context, scenario):
+    if 'load' in scenario.effective_tags:
+        if not load_selected(context):
+            scenario.skip('Load scenarios only run with --tags=@load')
+            return
+        if config.node == 'memory':
+            scenario.skip('The memory node has no UTX pool')
+            return
+
+    if 'script' in scenario.effective_tags and config.node == 'memory':
+        scenario.skip("The memory node doesn't execute account scripts")
+        return
+
+    context.confirmed_heights = set()
+    context.scenario_start = monotonic()
+    funding.prefund(context, scenario)
+
+
+def before_step(context, step):
+    if step.step_type != 'given':
+        funding.release_reserved_funds(context)
+
+    if trace.TRACE:
+        trace.TRACE.start_step(context.feature.name, context.scenario.name, '%s %s' % (step.keyword, step.name))
+
+
+def after_step(context, step):
+    if trace.TRACE:
+        trace.TRACE.end_step(step.status.name)
 
 
 def after_scenario(context, scenario):
+    if getattr(context, 'load', None):
+        context.load.stop()
+        print('\n'.join(context.load.report()))
+        report_file = context.config.userdata.get('load_report')
+        if report_file:
+            with open(report_file, 'a') as f:
+                f.write(json.dumps(dict(context.load.to_json(), scenario=scenario.name)) + '\n')
+
+    if scenario.status == Status.skipped:
+        return
+
+    context.feature_heights.update(context.confirmed_heights)
+    if timings.HISTORY and scenario.status == Status.passed:
+        timings.HISTORY.record_scenario(
+            scenario.feature.name, scenario.name, monotonic() - context.scenario_start, len(context.confirmed_heights)
+        )
+
     if scenario.status == Status.failed:
         print_users(context.users)
         print_txs(context.tx_ids)
 
 
 def print_users(users):
-    if users:
-        print('      users:')
+    if not users:
+        return
+
+    snapshot = take_snapshot(account.address for account in users.values())
+    print(f'      users (height {snapshot["height"]}):')
     for user, account in users.items():
-        print(f'        \033[1m\33[90m{user: <8}\33[0m\33[90m {account.address}\33[0m\33[90m {get_balance(account.address)}\33[0m')
+        balance = snapshot['accounts'][account.address]['balance']
+        print(f'        \033[1m\33[90m{user: <8}\33[0m\33[90m {account.address}\33[0m\33[90m {balance["regular"]}'
+              f' (effective {balance["effective"]})\33[0m')
 
 
 def print_txs(tx_ids):
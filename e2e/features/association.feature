@@ -49,7 +49,7 @@ Feature: Association
     Given Alice has an association with Bob of type 5
     When Alice revokes the association with Bob of type 5
     Then Alice is not associated with Bob
-    Then wait
+    Then wait for a block
     When Alice issues an association with Bob of type 5
     Then Alice is associated with Bob
     
@@ -76,6 +76,6 @@ Feature: Association
 
   Scenario: Issue association overwriting data
     Given Alice has an association with Bob that has data "foo" with value 10
-    And wait
+    And wait for a block
     When Alice issues an association with Bob that sets data "foo" to 42
     Then Alice has an association with Bob that has data "foo" with value 42
@@ -16,3 +16,8 @@ Feature: Anchor
     Given Alice has a new account
     When Alice tries to anchor key "foo" and value "1234"
     Then the transaction fails
+
+  Scenario: Multi mapped anchor transaction
+    Given Alice has an account with 5 lto
+    When Alice anchors 5 key/value pairs
+    Then Alice has 4.25 lto
@@ -51,6 +51,7 @@ Feature: Smart account
     And Alice cancels the sponsorship for Bob
     And Alice registers an account
 
+  @script
   Scenario: Restricted account
     Given Alice has a smart account with script
       """
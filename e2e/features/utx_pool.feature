@@ -0,0 +1,38 @@
+@load
+Feature: UTX pool under load
+  Transactions are broadcast faster than blocks can take them, while the size of the unconfirmed pool, the broadcast
+  latency and the rejections are sampled. The pool rejects new transactions when it's full and never evicts accepted
+  ones (only when they're older than max-transaction-age). It's ordered by fee, then by timestamp.
+
+  These scenarios only run against a real node, with `--tags=@load`. A time series is printed after each scenario.
+
+  Scenario: A backlog drains once the load stops
+    Given 10 load senders with 50 lto each
+    When 1000 anchor transactions are broadcast as fast as possible
+    Then no broadcast is rejected
+    And the unconfirmed pool held at least 1 transactions
+    And the unconfirmed pool drains within 20 blocks
+    And every accepted transaction is confirmed
+
+  Scenario: Transactions with a higher fee are confirmed first
+    Given 10 load senders with 50 lto each
+    When 1000 anchor transactions are broadcast as fast as possible
+    And 20 anchor transactions with 2 times the fee are broadcast
+    Then the transactions with the higher fee are confirmed before the backlog
+    And every accepted transaction is confirmed
+
+  Scenario: A full pool rejects new transactions
+    Given 20 load senders with 200 lto each
+    When anchor transactions are broadcast until the unconfirmed pool is full
+    Then broadcasts are rejected with error 199 "Transaction pool size limit is reached"
+    And the unconfirmed pool never exceeded its limit
+    And the unconfirmed pool drains within 60 blocks
+    And every accepted transaction is confirmed
+
+  Scenario: A full pool doesn't evict transactions for a higher fee
+    Given 20 load senders with 200 lto each
+    When anchor transactions are broadcast until the unconfirmed pool is full
+    And 20 anchor transactions with 10 times the fee are broadcast
+    Then transactions with the higher fee are rejected with error 199 "Transaction pool size limit is reached"
+    And the unconfirmed pool never exceeded its limit
+    And every accepted transaction is confirmed
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# Run the behave features in parallel. Every worker process gets its own sub-root account, which is funded once up
+# front, so scenarios in different workers never draw from (or check the balance of) the same account.
+#
+# USAGE: python -m e2e.parallel [-j WORKERS] [--funds LTO] [FEATURE ...] [-- BEHAVE_ARGS ...]
+
+import argparse
+import os
+import queue
+import subprocess
+import sys
+import threading
+from glob import glob
+from time import monotonic
+from types import SimpleNamespace
+
+from e2e.common import config, node
+from e2e.common.funding import fund_accounts
+from e2e.common.tools import AccountFactory, CHAIN_ID, convert_balance, get_balance
+
+FEATURES_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'features')
+
+
+def worker_seed(index):
+    return '%s/worker/%d' % (config.seed, index)
+
+
+def fund_workers(seeds, amount):
+    accounts = [AccountFactory(CHAIN_ID).create_from_seed(seed) for seed in seeds]
+    transfers = []
+    for account in accounts:
+        balance = get_balance(account.address)
+        if balance < amount:
+            transfers.append({'recipient': account.address, 'amount': amount - balance})
+
+    fund_accounts(SimpleNamespace(tx_ids=[]), transfers)
+    return accounts
+
+
+def run_feature(feature, seed, behave_args):
+    env = {**os.environ, 'LTO_WALLET_SEED': seed}
+    start = monotonic()
+    result = subprocess.run(
+        [sys.executable, '-m', 'behave', feature, *behave_args],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    return result.returncode, result.stdout, monotonic() - start
+
+
+def work(index, features, results, behave_args, lock):
+    seed = worker_seed(index)
+    while True:
+        try:
+            feature = features.get_nowait()
+        except queue.Empty:
+            return
+
+        code, output, duration = run_feature(feature, seed, behave_args)
+        with lock:
+            results.append((feature, code, duration))
+            print('\n\033[1m%s\033[0m (worker %d, %.1fs)\n%s' % (feature, index, duration, output), flush=True)
+
+
+def main(feature_files, workers, funds, behave_args):
+    # Larger feature files usually contain more scenarios. Starting with those gives a better spread over the workers.
+    feature_files = sorted(feature_files, key=os.path.getsize, reverse=True)
+    workers = max(1, min(workers, len(feature_files)))
+
+    started_node = False
+    if not node.is_node_up():
+        started_node = True
+        assert node.start_node(), "Unable to connect to node"
+
+    try:
+        start = monotonic()
+        fund_workers([worker_seed(i) for i in range(workers)], convert_balance(funds))
+
+        features = queue.Queue()
+        for feature in feature_files:
+            features.put(feature)
+
+        results = []
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(target=work, args=(i, features, results, behave_args, lock))
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if started_node:
+            node.stop_node()
+
+    print('\n%d features on %d workers in %.1fs' % (len(results), workers, monotonic() - start))
+    for feature, code, duration in sorted(results, key=lambda r: -r[2]):
+        print('  %-6s %6.1fs  %s' % ('passed' if code == 0 else 'FAILED', duration, os.path.relpath(feature)))
+
+    return 0 if all(code == 0 for _, code, _ in results) else 1
+
+
+if __name__ == '__main__':
+    args, behave_args = sys.argv[1:], []
+    if '--' in args:
+        args, behave_args = args[:args.index('--')], args[args.index('--') + 1:]
+
+    parser = argparse.ArgumentParser(description='Run the e2e features in parallel')
+    parser.add_argument('features', nargs='*', help='Feature files (default: all)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help='Number of parallel workers')
+    parser.add_argument('--funds', default='10000', help='LTO to fund each worker account with')
+    options = parser.parse_args(args)
+
+    sys.exit(main(
+        options.features or glob(os.path.join(FEATURES_DIR, '*.feature')),
+        options.workers,
+        options.funds,
+        behave_args
+    ))
@@ -1,22 +1,38 @@
 from behave import *
-from e2e.common.tools import ROOT_ACCOUNT, NODE, encode_hash, broadcast
+from e2e.common.tools import ROOT_ACCOUNT, TX_INDEX, encode_hash, broadcast
 from lto.transactions import Anchor
 from lto.crypto import encode
 from os import urandom
 
 
-def anchor(context, user, hash=None, sponsor=None, version=None):
+def anchor_tx(context, user, hash=None, sponsor=None, version=None, fee=None):
     account = context.users[user]
 
     transaction = Anchor(encode_hash(hash) if hash else urandom(32))
     transaction.version = version or Anchor.DEFAULT_VERSION
+    if fee:
+        transaction.tx_fee = fee
     transaction.sign_with(account)
 
     if sponsor:
         sponsor_account = context.users[sponsor]
         transaction.sponsor_with(sponsor_account)
 
-    broadcast(context, transaction)
+    return transaction
+
+
+def anchors_tx(context, user, number):
+    account = context.users[user]
+    hashes = [urandom(32) for i in range(0, number)]
+
+    transaction = Anchor(*hashes)
+    transaction.sign_with(account)
+
+    return transaction
+
+
+def anchor(context, user, hash=None, sponsor=None, version=None):
+    broadcast(context, anchor_tx(context, user, hash, sponsor, version))
 
 
 @when(u'{user} anchors "{hash}"')
@@ -39,16 +55,10 @@ def step_impl(context, user, hash='', sponsor=None):
 @then('There is an anchor transaction with hash "{hash}" signed by {user}')
 def step_impl(context, hash, user):
     digest = encode(encode_hash(hash), 'base58')
-    txs = NODE.transactions(context.users[user], 'anchor')
-    anchors = [anchor.base58() for tx in txs for anchor in tx.anchors]
-    assert digest in anchors, 'Anchor tx with hash "{}" not found'.format(hash)
+    tx = TX_INDEX.anchor(context.users[user].address, digest)
+    assert tx is not None, 'Anchor tx with hash "{}" not found'.format(hash)
 
 
 @when(u'{user} anchors {number:d} hashes')
 def step_impl(context, user, number):
-    account = context.users[user]
-    hashes = [urandom(32) for i in range(0, number)]
-
-    transaction = Anchor(*hashes)
-    transaction.sign_with(account)
-    broadcast(context, transaction)
+    broadcast(context, anchors_tx(context, user, number))
@@ -1,5 +1,5 @@
 from behave import *
-from e2e.common.tools import broadcast, NODE, funds_for_transaction, cast_boolean_or_int
+from e2e.common.tools import broadcast, funds_for_transaction, cast_boolean_or_int
 from lto.binary import Binary
 from lto.transactions import Association, RevokeAssociation
 from e2e.steps.generic import wait
@@ -10,7 +10,7 @@ def data_value(data_entries, key):
     return entry['value'] if entry else None
 
 
-def association(context, sender, type, recipient, subject=None, data=None, version=None):
+def association_tx(context, sender, type, recipient, subject=None, data=None, version=None):
     sender = context.users[sender]
     recipient = context.users[recipient]
     
@@ -18,14 +18,18 @@ def association(context, sender, type, recipient, subject=None, data=None, versi
     transaction.version = version or Association.DEFAULT_VERSION
     transaction.sign_with(sender)
 
-    broadcast(context, transaction)
+    return transaction
+
+
+def association(context, sender, type, recipient, subject=None, data=None, version=None):
+    broadcast(context, association_tx(context, sender, type, recipient, subject, data, version))
 
 
-def is_associated(context, sender, recipient):
+def is_associated(context, sender, recipient, fresh=False):
     sender = context.users[sender]
     recipient = context.users[recipient]
 
-    result = NODE.request(endpoint='/associations/status/{}'.format(sender.address))
+    result = context.relations.get_associations(sender.address, fresh)
     list_outgoing = result['outgoing']
 
     return list(filter(lambda assoc: assoc['recipient'] == recipient.address, list_outgoing))
@@ -52,7 +56,7 @@ def step_impl(context, sender, recipient, type, subject=None):
     if not is_associated(context, sender, recipient):
         funds_for_transaction(context, sender, Association.BASE_FEE)
         association(context, sender, type, recipient, subject)
-        assert is_associated(context, sender, recipient), 'Failed to issue association'
+        assert is_associated(context, sender, recipient, fresh=True), 'Failed to issue association'
 
 
 @given('{sender} does not have an association with {recipient} of type {type:d}')
@@ -61,7 +65,7 @@ def step_impl(context, sender, recipient, type):
         funds_for_transaction(context, sender, RevokeAssociation.BASE_FEE)
         revoke_association(context, sender, type, recipient, assoc.hash)
 
-    assert not is_associated(context, sender, recipient), 'Failed to revoke association'
+    assert not is_associated(context, sender, recipient, fresh=True), 'Failed to revoke association'
 
 
 @when('{sender} issues an association with {recipient} of type {type:d}')
@@ -99,14 +103,14 @@ def step_impl(context, sender, recipient, type):
 
 @then('{sender} is associated with {recipient}')
 def step_impl(context, sender, recipient):
-    assocs = is_associated(context, sender, recipient)
+    assocs = is_associated(context, sender, recipient, fresh=True)
     assert assocs, '{} is not associated with {}'\
         .format(context.users[sender].address, context.users[recipient].address)
 
 
 @then('{sender} is not associated with {recipient}')
 def step_impl(context, sender, recipient):
-    value = is_associated(context, sender, recipient)
+    value = is_associated(context, sender, recipient, fresh=True)
     assert not value, f'{value}'
 
 
@@ -129,7 +133,7 @@ def step_impl(context, sender, recipient, key, str=None, value=None):
     recipient_addr = context.users[recipient].address
     value = str or cast_boolean_or_int(value)
 
-    assocs = is_associated(context, sender, recipient)
+    assocs = is_associated(context, sender, recipient, fresh=True)
     assert assocs, '{} is not associated with {}'.format(sender_addr, recipient_addr)
 
     found = next((v for v in [data_value(assoc['data'], key) for assoc in assocs] if v is not None), None)
@@ -3,14 +3,18 @@ from e2e.common.tools import *
 from lto.transactions import Data
 
 
-def set_data(context, user=None, data=None, version=None):
+def set_data_tx(context, user=None, data=None, version=None):
     account = context.users[user] if user else ROOT_ACCOUNT
 
     transaction = Data(data or {})
     transaction.version = version or Data.DEFAULT_VERSION
     transaction.sign_with(account)
 
-    broadcast(context, transaction)
+    return transaction
+
+
+def set_data(context, user=None, data=None, version=None):
+    broadcast(context, set_data_tx(context, user, data, version))
 
 
 @when(u'{user} sets data "{key}" to {value}')
@@ -1,5 +1,8 @@
 from behave import *
 from e2e.common.tools import *
+from e2e.common.funding import planned_account
+from e2e.common import trace
+from e2e.common.wait import wait_for_blocks, wait_for_balance, wait_for_data
 from time import sleep
 
 
@@ -7,7 +10,10 @@ from time import sleep
 @given('{user} has a new {key_type} account')
 @given('{user} has a new {key_type} account with private key "{private_key}"')
 def step_impl(context, user, key_type='ed25519', private_key = None):
-    context.users.update({user: generate_account(key_type, private_key)})
+    account = None if private_key else planned_account(context, user, key_type)
+    context.users.update({user: account or generate_account(key_type, private_key)})
+    if not private_key:
+        context.relations.add_new_account(context.users[user].address)
 
 
 @given('{user} has an account with {balance} lto')
@@ -36,4 +42,36 @@ def step_impl(context):
 @then('wait')
 @then('wait {seconds} seconds')
 def wait(context, seconds=5):
-    sleep(seconds)
+    with trace.phase('sleep'):
+        sleep(float(seconds))
+
+
+@given('wait for a block')
+@when('wait for a block')
+@then('wait for a block')
+def step_impl(context):
+    with trace.phase('wait'):
+        height = wait_for_blocks(1)
+    waited_for(context, height)
+
+
+@given('wait {count:d} blocks')
+@when('wait {count:d} blocks')
+@then('wait {count:d} blocks')
+def step_impl(context, count):
+    with trace.phase('wait'):
+        height = wait_for_blocks(count)
+    waited_for(context, *range(height - count + 1, height + 1))
+
+
+@then('{user} will have {balance} lto')
+def step_impl(context, user, balance):
+    with trace.phase('wait'):
+        wait_for_balance(context.users[user].address, convert_balance(balance))
+
+
+@then('{user} will have data "{key}" with value {value}')
+@then('{user} will have data "{key}" with value "{str}"')
+def step_impl(context, user, key, str=None, value=None):
+    with trace.phase('wait'):
+        wait_for_data(context.users[user].address, key, str or cast_boolean_or_int(value))
@@ -1,13 +1,13 @@
 import lto
 from behave import *
-from e2e.common.tools import NODE, broadcast, convert_balance, funds_for_transaction, minimum_balance
+from e2e.common.tools import broadcast, convert_balance, funds_for_transaction, minimum_balance
 from lto.transactions import Lease, CancelLease
 
 
-def is_leasing(context, account1, account2, amount=""):
+def is_leasing(context, account1, account2, amount="", fresh=False):
     account1 = context.users[account1]
     account2 = context.users[account2]
-    lease_list = NODE.lease_list(account1.address)
+    lease_list = context.relations.get_leases(account1.address, fresh)
     leases = []
     for lease in lease_list:
         if lease['recipient'] == account2.address:
@@ -20,7 +20,7 @@ def is_leasing(context, account1, account2, amount=""):
 
 
 def get_lease_id(context, account1, account2):
-    lease_list = NODE.lease_list(account1.address)
+    lease_list = context.relations.get_leases(account1.address)
     for lease in lease_list:
         if lease['recipient'] == account2.address:
             return lease['id']
@@ -56,6 +56,7 @@ def step_impl(context, user1, user2):
     if is_leasing(context, user1, user2):
         funds_for_transaction(context, user1, CancelLease.BASE_FEE)
         cancel_lease(context, user1, user2)
+        assert not is_leasing(context, user1, user2, fresh=True), 'Failed to cancel lease'
 
 
 @when('{user1} tries to cancels the lease to {user2}')
@@ -73,6 +74,7 @@ def step_impl(context, user1, amount, user2):
         minimum_balance(context, user1, amount)
         funds_for_transaction(context, user1, Lease.BASE_FEE)
         lease(context, user1, user2, amount)
+        assert is_leasing(context, user1, user2, amount, fresh=True), 'Failed to lease'
 
 
 @when('{user1} leases {amount} lto to {user2}')
@@ -99,11 +101,11 @@ def step_impl(context, user1, amount, user2):
 @then('{user1} is leasing {amount} lto to {user2}')
 def step_impl(context, user1, amount, user2):
     amount = convert_balance(amount)
-    value = is_leasing(context, user1, user2, amount)
+    value = is_leasing(context, user1, user2, amount, fresh=True)
     assert value, f'{user1} is not leasing to {user2}'
 
 
 @then('{user1} is not leasing to {user2}')
 def step_impl(context, user1, user2):
-    value = is_leasing(context, user1, user2)
+    value = is_leasing(context, user1, user2, fresh=True)
     assert not value, f'{value}'
@@ -1,16 +1,31 @@
 from behave import *
-from e2e.common.tools import NODE, encode_hash, broadcast
+from e2e.common.tools import TX_INDEX, encode_hash, broadcast
 from lto.transactions import MappedAnchor
+from os import urandom
 
 
-def mapped_anchor(context, user, key, value, version=None):
+def mapped_anchor_tx(context, user, key, value, version=None):
     account = context.users[user]
 
     transaction = MappedAnchor({encode_hash(key): encode_hash(value)})
     transaction.version = version or MappedAnchor.DEFAULT_VERSION
     transaction.sign_with(account)
 
-    broadcast(context, transaction)
+    return transaction
+
+
+def mapped_anchors_tx(context, user, number):
+    account = context.users[user]
+    anchors = {urandom(32): urandom(32) for i in range(0, number)}
+
+    transaction = MappedAnchor(anchors)
+    transaction.sign_with(account)
+
+    return transaction
+
+
+def mapped_anchor(context, user, key, value, version=None):
+    broadcast(context, mapped_anchor_tx(context, user, key, value, version))
 
 
 @when(u'{user} anchors key "{key}" and value "{value}"')
@@ -32,10 +47,11 @@ def step_impl(context, key, value, user):
     key_digest = encode_hash(key)
     value_digest = encode_hash(value)
 
-    txs = NODE.transactions(context.users[user], 'mapped-anchor')
-
-    print([tx.to_json() for tx in txs])
-
-    found = next((v for v in [tx.anchors.get(key_digest) for tx in txs] if v is not None), None)
+    found = TX_INDEX.mapped_anchor(context.users[user].address, key_digest)
     assert found is not None, 'no anchor tx with key {}'.format(key)
     assert found == value_digest, 'anchor {} has value {} instead of {}'.format(key, found, value)
+
+
+@when(u'{user} anchors {number:d} key/value pairs')
+def step_impl(context, user, number):
+    broadcast(context, mapped_anchors_tx(context, user, number))
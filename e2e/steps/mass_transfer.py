@@ -11,12 +11,17 @@ def process_input(context, transfers):
     return transfer_list
 
 
-def mass_transfer(context, transfers, sender, version=None):
+def mass_transfer_tx(context, transfers, sender, version=None):
     sender = context.users[sender]
     transaction = MassTransfer(process_input(context, transfers))
     transaction.version = version or MassTransfer.DEFAULT_VERSION
     transaction.sign_with(sender)
-    broadcast(context, transaction)
+
+    return transaction
+
+
+def mass_transfer(context, transfers, sender, version=None):
+    broadcast(context, mass_transfer_tx(context, transfers, sender, version))
 
 
 @when(u'{sender} tries to do a mass-transfer of {amount1} lto to {receiver1} and {amount2} lto to {receiver2}')
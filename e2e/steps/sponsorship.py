@@ -1,12 +1,12 @@
 from behave import *
-from e2e.common.tools import funds_for_transaction, NODE, broadcast
+from e2e.common.tools import funds_for_transaction, broadcast
 from lto.transactions import Sponsorship, CancelSponsorship
 
 
-def is_sponsoring(context, user1, user2):
+def is_sponsoring(context, user1, user2, fresh=False):
     account1 = context.users[user1]
     account2 = context.users[user2]
-    sponsorships = NODE.sponsorship_list(account2.address)
+    sponsorships = context.relations.get_sponsors(account2.address, fresh)
     if account1.address in sponsorships['sponsor']:
         return sponsorships
     else:
@@ -36,6 +36,7 @@ def step_impl(context, user1, user2):
     if is_sponsoring(context, user1, user2):
         funds_for_transaction(context, user1, CancelSponsorship.BASE_FEE)
         cancel_sponsorship(context, user2, user1)
+        assert not is_sponsoring(context, user1, user2, fresh=True), 'Failed to cancel sponsorship'
 
 
 @given('{user1} is sponsoring {user2}')
@@ -43,6 +44,7 @@ def step_impl(context, user1, user2):
     if not is_sponsoring(context, user1, user2):
         funds_for_transaction(context, user1, Sponsorship.BASE_FEE)
         sponsor(context, user2, user1)
+        assert is_sponsoring(context, user1, user2, fresh=True), 'Failed to sponsor'
 
 
 @when('{user1} tries to sponsor {user2}')
@@ -75,11 +77,11 @@ def step_impl(context, user1, user2, version=None):
 
 @then('{user1} is sponsoring {user2}')
 def step_impl(context, user1, user2):
-    value = is_sponsoring(context, user1, user2)
+    value = is_sponsoring(context, user1, user2, fresh=True)
     assert value, f'{user1} is not sponsoring {user2}'
 
 
 @then('{user1} is not sponsoring {user2}')
 def step_impl(context, user1, user2):
-    value = is_sponsoring(context, user1, user2)
+    value = is_sponsoring(context, user1, user2, fresh=True)
     assert not value, f'{value}'
@@ -1,11 +1,11 @@
 from behave import *
-from e2e.common.tools import broadcast, cast_boolean_or_int, NODE
+from e2e.common.tools import broadcast, cast_boolean_or_int, TX_INDEX
 from lto.binary import Binary
 from lto.transactions import Statement
 from e2e.steps.generic import wait
 
 
-def statement(context, sender, type, recipient=None, subject=None, data=None, version=3):
+def statement_tx(context, sender, type, recipient=None, subject=None, data=None, version=3):
     sender = context.users[sender]
     recipient = context.users[recipient].address if recipient else None
     
@@ -13,12 +13,11 @@ def statement(context, sender, type, recipient=None, subject=None, data=None, ve
     transaction.version = version or Statement.DEFAULT_VERSION
     transaction.sign_with(sender)
 
-    broadcast(context, transaction)
+    return transaction
 
 
-def data_value(data_entries, key):
-    entry = next(filter(lambda e: e.key == key, data_entries), None)
-    return entry.value if entry else None
+def statement(context, sender, type, recipient=None, subject=None, data=None, version=3):
+    broadcast(context, statement_tx(context, sender, type, recipient, subject, data, version))
 
 
 @when('{sender} makes a statement of type {type:d}')
@@ -45,9 +44,8 @@ def step_impl(context, sender, key, str=None, value=None):
 @then('There is an statement transaction with data "{key}" is {value} signed by {user}')
 @then('There is an statement transaction with data "{key}" is "{str}" signed by {user}')
 def step_impl(context, user, key, value=None, str=None):
-    txs = NODE.transactions(context.users[user], 'statement')
     value = str or cast_boolean_or_int(value)
 
-    found = next((v for v in [data_value(tx.data, key) for tx in txs] if v is not None), None)
+    found = TX_INDEX.statement_data(context.users[user].address, key)
     assert found is not None, 'no statement with key {}'.format(key)
     assert found == value, 'statement data {} is {} instead of {}'.format(key, found, value)
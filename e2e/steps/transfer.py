@@ -1,9 +1,9 @@
 from behave import *
-from e2e.common.tools import ROOT_ACCOUNT, convert_balance, get_balance, broadcast, assert_equals
+from e2e.common.tools import ROOT_ACCOUNT, convert_balance, get_balance, snapshot_balance, broadcast, assert_equals, reserved_funds
 from lto.transactions import Transfer
 
 
-def transfer_to(context, recipient="", amount=0, sender="", version=None):
+def transfer_tx(context, recipient="", amount=0, sender="", version=None):
     if not recipient:
         recipient_account = ROOT_ACCOUNT
     else:
@@ -17,12 +17,17 @@ def transfer_to(context, recipient="", amount=0, sender="", version=None):
     transaction = Transfer(recipient_account.address, amount)
     transaction.version = version or Transfer.DEFAULT_VERSION
     transaction.sign_with(sender_account)
-    broadcast(context, transaction)
+
+    return transaction
+
+
+def transfer_to(context, recipient="", amount=0, sender="", version=None):
+    broadcast(context, transfer_tx(context, recipient, amount, sender, version))
 
 
 @given('{user} has {balance} lto')
 def step_impl(context, user, balance):
-    balance = convert_balance(balance)
+    balance = convert_balance(balance) + reserved_funds(context, user)
     user_balance = get_balance(context.users[user].address)
 
     if user_balance < balance:
@@ -39,7 +44,7 @@ def step_impl(context, user, balance):
 @then('{user} has {balance} lto')
 def step_impl(context, user, balance):
     balance = convert_balance(balance)
-    assert_equals(get_balance(context.users[user].address), balance)
+    assert_equals(snapshot_balance(context, user), balance)
 
 
 @when('{sender} transfers {amount} lto to {recipient}')
@@ -0,0 +1,153 @@
+from behave import *
+from lto.transactions import Anchor
+from e2e.common import config, trace
+from e2e.common.funding import fund_accounts
+from e2e.common.tools import convert_balance, generate_account
+from e2e.common.utx_load import LoadRun, POOL_FULL, overtaken
+from e2e.common.wait import wait_until
+from e2e.steps.anchor import anchor_tx
+
+
+def load_run(context):
+    if getattr(context, 'load', None) is None:
+        context.load = LoadRun()
+    return context.load
+
+
+def anchors(context, count, fee=None):
+    # Signed up front, so the broadcast rate isn't limited by signing
+    senders = context.load_senders
+    with trace.phase('sign'):
+        return [anchor_tx(context, senders[i % len(senders)], fee=fee) for i in range(count)]
+
+
+def pool_limit(context):
+    if not config.utx_max_size:
+        context.scenario.skip('Set LTO_E2E_UTX_MAX_SIZE to the UTX pool limit of the node')
+        return None
+    return int(config.utx_max_size)
+
+
+@given('{count:d} load senders with {balance} lto each')
+def step_impl(context, count, balance):
+    context.load_senders = ['load%d' % i for i in range(count)]
+    for name in context.load_senders:
+        context.users[name] = generate_account()
+
+    fund_accounts(context, [
+        {'recipient': context.users[name].address, 'amount': convert_balance(balance)} for name in context.load_senders
+    ])
+
+
+@when('{count:d} anchor transactions are broadcast as fast as possible')
+def step_impl(context, count):
+    transactions = anchors(context, count)
+    with trace.phase('http'):
+        load_run(context).broadcast(transactions)
+
+
+@when('{count:d} anchor transactions with {multiplier:d} times the fee are broadcast')
+def step_impl(context, count, multiplier):
+    transactions = anchors(context, count, (Anchor.BASE_FEE + Anchor.VAR_FEE) * multiplier)
+    sampler = load_run(context).sampler
+    context.load_backlog = sampler.sample()
+    with trace.phase('http'):
+        load_run(context).broadcast(transactions, 'high fee')
+    context.load_broadcast = sampler.sample() or sampler.samples[-1]
+
+
+@when('anchor transactions are broadcast until the unconfirmed pool is full')
+def step_impl(context):
+    limit = pool_limit(context)
+    if limit is None:
+        return
+
+    # Blocks take transactions from the pool while it's filled, so more than the limit is needed
+    transactions = anchors(context, limit * 3)
+    with trace.phase('http'):
+        load_run(context).broadcast(transactions, stop_on=POOL_FULL)
+
+
+@then('the unconfirmed pool held at least {count:d} transactions')
+def step_impl(context, count):
+    largest = max((sample['size'] for sample in context.load.sampler.samples), default=0)
+    assert largest >= count, 'The unconfirmed pool held at most %d transactions' % largest
+
+
+@then('the unconfirmed pool never exceeded its limit')
+def step_impl(context):
+    limit = pool_limit(context)
+    largest = max((sample['size'] for sample in context.load.sampler.samples), default=0)
+    assert largest <= limit, 'The unconfirmed pool held %d transactions, the limit is %d' % (largest, limit)
+
+
+def assert_rejected(context, error, message, label=None):
+    rejected = context.load.rejected(label)
+    assert any(r['error'] == error and message in (r['message'] or '') for r in rejected), \
+        'No rejection with error %d "%s" in %d rejections' % (error, message, len(rejected))
+
+
+@then('broadcasts are rejected with error {error:d} "{message}"')
+def step_impl(context, error, message):
+    assert_rejected(context, error, message)
+
+
+@then('transactions with the higher fee are rejected with error {error:d} "{message}"')
+def step_impl(context, error, message):
+    # The pool doesn't make room for them by evicting transactions with a lower fee
+    assert_rejected(context, error, message, 'high fee')
+
+
+@then('no broadcast is rejected')
+def step_impl(context):
+    rejected = context.load.rejected()
+    assert not rejected, '%d broadcasts were rejected, the first with "%s"' % (len(rejected), rejected[0]['message'])
+
+
+@then('the unconfirmed pool drains within {count:d} blocks')
+def step_impl(context, count):
+    sampler = context.load.sampler
+    start = sampler.sample() or sampler.samples[-1]
+
+    def drained():
+        sample = sampler.sample()
+        return sample if sample and sample['size'] == 0 else None
+
+    with trace.phase('wait'):
+        end = wait_until(drained, timeout=600, interval=0.5, message='The unconfirmed pool did not drain')
+
+    context.load.drain = {'seconds': end['time'] - start['time'], 'blocks': end['height'] - start['height']}
+    assert context.load.drain['blocks'] <= count, 'The unconfirmed pool took %d blocks (%.1fs) to drain' % (
+        context.load.drain['blocks'], context.load.drain['seconds']
+    )
+
+
+@then('every accepted transaction is confirmed')
+def step_impl(context):
+    with trace.phase('wait'):
+        heights = context.load.heights()
+    missing = sum(1 for height in heights if height is None)
+    assert not missing, '%d of %d accepted transactions were not confirmed' % (missing, len(heights))
+
+
+@then('the transactions with the higher fee are confirmed before the backlog')
+def step_impl(context):
+    assert context.load_backlog and context.load_backlog['size'] > 0, \
+        'The unconfirmed pool was empty when the transactions with the higher fee were broadcast'
+
+    with trace.phase('wait'):
+        high = context.load.confirmed('high fee')
+        backlog = context.load.confirmed('normal')
+
+    assert all(r['height'] is not None for r in high), 'Not every transaction with the higher fee was confirmed'
+
+    # Every block after this height was forged while all of them were in the pool. The pool is ordered by fee, so none
+    # of those blocks takes a transaction of the backlog while one with the higher fee is waiting. In a FIFO pool, they
+    # would wait for the whole backlog that was broadcast before them.
+    height = context.load_broadcast['height']
+    assert any((r['height'] or 0) > height for r in backlog), \
+        'The backlog was confirmed before the transactions with the higher fee were in the pool'
+
+    pairs = overtaken(high, backlog, height)
+    assert not pairs, '%d transactions with the higher fee were confirmed after the backlog, e.g. at height %d after ' \
+                      'height %d' % (len({r['id'] for r, _ in pairs}), pairs[0][0]['height'], pairs[0][1]['height'])
@@ -0,0 +1,79 @@
+import pytest
+
+from e2e.common.confirmation import ConfirmationTracker
+
+
+class FakeTracker(ConfirmationTracker):
+    """Serves the blocks of a list instead of a node; a block is a list of transaction ids."""
+
+    def __init__(self, blocks, **kwargs):
+        super().__init__('http://node', **kwargs)
+        self.blocks = blocks
+        self.requests = []
+        self.fail = None
+
+    def _get(self, endpoint):
+        self.requests.append(endpoint)
+        if self.fail:
+            raise self.fail
+        if endpoint == '/blocks/height':
+            return {'height': len(self.blocks)}
+        start, end = (int(part) for part in endpoint.split('/')[-2:])
+        return [
+            {'height': height, 'transactions': [{'id': id} for id in self.blocks[height - 1]]}
+            for height in range(start, end + 1)
+        ]
+
+
+def test_resolves_a_transaction_in_a_scanned_block():
+    tracker = FakeTracker([[], ['a'], []])
+    future = tracker.watch('a')
+
+    assert future.result(2) == {'id': 'a', 'height': 2}
+
+
+def test_rescans_the_top_block_when_the_height_is_unchanged():
+    tracker = FakeTracker([[], []])
+    tracker.scanned = 1
+    tracker._tick(resumed=False)
+
+    tracker.blocks[-1].append('a')  # The liquid block was extended by a micro block
+    future = tracker.watch('a')
+
+    assert future.result(2)['height'] == 2
+
+
+def test_keeps_running_after_an_unexpected_error():
+    tracker = FakeTracker([['a']], step=0.01)
+    tracker.fail = ValueError('not json')
+    future = tracker.watch('a')
+
+    with pytest.raises(TimeoutError):
+        future.exception(0.1)
+    assert tracker.thread.is_alive()
+
+    tracker.fail = None
+    assert future.result(2)['id'] == 'a'
+
+
+def test_a_failing_listener_doesnt_block_the_future():
+    tracker = FakeTracker([['a']])
+    tracker.subscribe(lambda tx: {}['missing'])
+
+    assert tracker.watch('a').result(2)['id'] == 'a'
+
+
+def test_expires_a_transaction_that_is_not_confirmed():
+    tracker = FakeTracker([[]], step=0.01)
+    future = tracker.watch('a', timeout=0.05)
+
+    with pytest.raises(TimeoutError, match='not confirmed in time'):
+        future.result(2)
+    assert not tracker.pending
+
+
+def test_wait_has_a_deadline_of_its_own():
+    tracker = FakeTracker([[]], timeout=5)
+
+    assert tracker.result_timeout() > 5
+    assert tracker.result_timeout(1) < tracker.result_timeout()
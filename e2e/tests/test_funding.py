@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+import pytest
+from lto.transactions import Association, Lease
+
+from e2e.common import funding
+from e2e.common.tools import ROOT_ACCOUNT, generate_account
+
+
+def steps(*lines):
+    return [SimpleNamespace(step_type=keyword.lower(), name=name)
+            for keyword, name in (line.split(' ', 1) for line in lines)]
+
+
+def test_plan_new_accounts_with_balances_and_fees():
+    accounts, balances, reserved = funding.plan(steps(
+        'Given Alice has an account with 100 lto',
+        'Given Bob has a new secp256k1 account',
+        'Given Bob has 5 lto',
+        'Given Alice is leasing 10 lto to Bob',
+        'Given Alice has an association with Bob of type 1',
+        'When Alice has a new account',
+    ))
+
+    assert accounts == {'Alice': 'ed25519', 'Bob': 'secp256k1'}
+    assert balances == {'Alice': 100 * 10 ** 8, 'Bob': 5 * 10 ** 8}
+    assert reserved == {'Alice': Lease.BASE_FEE + Association.BASE_FEE}
+
+
+def test_plan_skips_accounts_that_arent_new():
+    accounts, balances, reserved = funding.plan(steps(
+        'Given Alice has 100 lto',
+        'Given Alice is leasing 10 lto to Bob',
+    ))
+
+    assert (accounts, balances, reserved) == ({}, {}, {})
+
+
+def test_plan_skips_accounts_that_are_created_twice():
+    accounts, balances, reserved = funding.plan(steps(
+        'Given Alice has a new account',
+        'Given Alice is leasing 10 lto to Bob',
+        'Given Alice has a new account',
+        'Given Bob has a new account',
+    ))
+
+    assert accounts == {'Bob': 'ed25519'}
+    assert reserved == {}
+
+
+@pytest.fixture
+def broadcasts(monkeypatch):
+    sent = []
+    monkeypatch.setattr(funding, 'broadcast', lambda context, transaction: sent.append(transaction))
+    return sent
+
+
+def test_release_reserved_funds(broadcasts):
+    alice = generate_account()
+    context = SimpleNamespace(users={'Alice': alice, 'Bob': generate_account()}, reserved={'Alice': 3000, 'Bob': 0})
+
+    funding.release_reserved_funds(context)
+
+    [transaction] = broadcasts
+    assert (transaction.sender, transaction.recipient, transaction.amount) == (alice.address, ROOT_ACCOUNT.address, 3000)
+    # Sponsored by the root account, so a sponsor of Alice doesn't pay the fee
+    assert transaction.sponsor == ROOT_ACCOUNT.address
+    assert len(transaction.proofs) == 2
+    assert context.reserved == {}
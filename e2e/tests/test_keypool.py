@@ -0,0 +1,77 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from lto.accounts import AccountFactoryED25519, AccountFactoryECDSA
+
+from e2e.common.keypool import KeyPool, RECORD_SIZE
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return KeyPool(str(tmp_path))
+
+
+def test_take_from_an_empty_pool(pool):
+    assert pool.take('ed25519') is None
+    assert pool.missed['ed25519'] == 1
+    assert pool.available('ed25519') == 0
+
+
+def test_take_an_unknown_key_type(pool):
+    assert pool.take('rsa') is None
+    assert pool.missed['rsa'] == 1
+
+
+def test_refill_writes_fixed_size_records(pool, tmp_path):
+    assert pool.refill('ed25519', 5, workers=2) == 5
+
+    assert os.path.getsize(tmp_path / 'ed25519.keys') == 5 * RECORD_SIZE
+    assert pool.available('ed25519') == 5
+
+
+@pytest.mark.parametrize('key_type', ['ed25519', 'secp256k1'])
+def test_taken_keys_create_accounts(pool, key_type):
+    pool.refill(key_type, 2, workers=1)
+    factory = AccountFactoryED25519('T') if key_type == 'ed25519' else AccountFactoryECDSA('T', key_type)
+
+    first, second = pool.take(key_type), pool.take(key_type)
+
+    assert first != second
+    assert factory.create_from_private_key(first).key_type == key_type
+    assert pool.take(key_type) is None
+    assert pool.taken[key_type] == 2
+
+
+def test_cursor_is_shared_between_pools(pool, tmp_path):
+    pool.refill('ed25519', 3, workers=1)
+    other = KeyPool(str(tmp_path))
+
+    keys = [pool.take('ed25519'), other.take('ed25519'), pool.take('ed25519')]
+
+    assert len(set(keys)) == 3
+    assert other.available('ed25519') == 0
+
+
+def test_concurrent_takes_never_return_the_same_key(tmp_path):
+    KeyPool(str(tmp_path)).refill('ed25519', 40, workers=2)
+    pools = [KeyPool(str(tmp_path)) for _ in range(4)]
+
+    with ThreadPoolExecutor(4) as executor:
+        keys = list(executor.map(lambda i: pools[i % 4].take('ed25519'), range(50)))
+
+    taken = [key for key in keys if key]
+    assert len(taken) == 40
+    assert len(set(taken)) == 40
+
+
+def test_refill_keeps_unused_keys_and_drops_used_ones(pool, tmp_path):
+    pool.refill('ed25519', 3, workers=1)
+    keys = (tmp_path / 'ed25519.keys').read_text().split()
+    used = pool.take('ed25519')
+
+    assert pool.refill('ed25519', 3, workers=1) == 1
+
+    refilled = [pool.take('ed25519') for _ in range(3)]
+    assert used == keys[0]
+    assert refilled[:2] == keys[1:]
+    assert refilled[2] not in keys
@@ -0,0 +1,29 @@
+import pytest
+
+from e2e.bench.mass_transfer_sweep import MAX_TRANSFER_COUNT, curves, parse_sizes
+
+
+def test_sizes_are_sorted_and_unique():
+    assert parse_sizes('10,1,5,10') == [1, 5, 10]
+
+
+@pytest.mark.parametrize('sizes', ['0,1', '1,%d' % (MAX_TRANSFER_COUNT + 1)])
+def test_sizes_out_of_range(sizes):
+    with pytest.raises(ValueError):
+        parse_sizes(sizes)
+
+
+def result(key_type, recipients, p50):
+    summary = {'p50': p50}
+    return {'key_type': key_type, 'recipients': recipients, 'sign': summary, 'broadcast': summary, 'block': summary,
+            'binary_bytes': 100 * recipients, 'fee_per_recipient': 1000 / recipients}
+
+
+def test_curves_per_key_type():
+    by_key_type = curves([result('ed25519', 1, 0.1), result('secp256k1', 1, 0.3), result('ed25519', 10, 0.2)])
+
+    assert set(by_key_type) == {'ed25519', 'secp256k1'}
+    assert by_key_type['ed25519']['recipients'] == [1, 10]
+    assert by_key_type['ed25519']['sign'] == [0.1, 0.2]
+    assert by_key_type['ed25519']['fee_per_recipient'] == [1000, 100]
+    assert by_key_type['secp256k1']['binary_bytes'] == [100]
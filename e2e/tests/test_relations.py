@@ -0,0 +1,139 @@
+from concurrent.futures import Future
+from types import SimpleNamespace
+import pytest
+
+from e2e.common import tools
+from e2e.common.relations import RelationCache, TYPES
+
+
+class FakeNode:
+    def __init__(self):
+        self.requests = []
+
+    def request(self, endpoint):
+        self.requests.append(endpoint)
+        return {'address': endpoint.split('/')[-1], 'outgoing': [], 'incoming': []}
+
+    def lease_list(self, address):
+        self.requests.append('/leasing/active/%s' % address)
+        return []
+
+    def sponsorship_list(self, address):
+        self.requests.append('/sponsorship/status/%s' % address)
+        return {'sponsor': []}
+
+
+@pytest.fixture
+def node():
+    return FakeNode()
+
+
+@pytest.fixture
+def cache(node):
+    cache = RelationCache(node)
+    for address in ('alice', 'bob'):
+        cache.add_new_account(address)
+    return cache
+
+
+def transaction(proof):
+    return SimpleNamespace(proofs=[proof])
+
+
+def test_new_accounts_are_not_fetched(cache, node):
+    assert cache.get_leases('alice') == []
+    assert cache.get_sponsors('bob') == {'sponsor': []}
+    assert node.requests == []
+
+
+def test_fresh_reads_ask_the_node(cache, node):
+    cache.get_associations('alice', fresh=True)
+    cache.get_associations('alice')
+
+    assert node.requests == ['/associations/status/alice']
+
+
+def test_confirmed_transactions_update_the_cache(cache):
+    lease = {'id': 'lease1', 'type': TYPES['lease'], 'sender': 'alice', 'recipient': 'bob'}
+    cache.confirmed(lease)
+    cache.confirmed({'type': TYPES['sponsorship'], 'sender': 'alice', 'recipient': 'bob'})
+    cache.confirmed({'type': TYPES['association'], 'sender': 'alice', 'recipient': 'bob', 'associationType': 1,
+                     'timestamp': 1})
+
+    assert cache.get_leases('alice') == cache.get_leases('bob') == [lease]
+    assert cache.get_sponsors('bob') == {'sponsor': ['alice']}
+    assert [a['recipient'] for a in cache.get_associations('alice')['outgoing']] == ['bob']
+    assert [a['sender'] for a in cache.get_associations('bob')['incoming']] == ['alice']
+
+    cache.confirmed({'type': TYPES['cancel-lease'], 'leaseId': 'lease1'})
+    cache.confirmed({'type': TYPES['cancel-sponsorship'], 'sender': 'alice', 'recipient': 'bob'})
+    cache.confirmed({'type': TYPES['revoke-association'], 'sender': 'alice', 'recipient': 'bob', 'associationType': 1})
+
+    assert cache.get_leases('alice') == []
+    assert cache.get_sponsors('bob') == {'sponsor': []}
+    assert cache.get_associations('alice')['outgoing'] == []
+
+
+def test_unexpected_transactions_drop_the_addresses(cache, node):
+    cache.seen({'proofs': ['other'], 'sender': 'alice', 'transfers': [{'recipient': 'bob'}]})
+
+    cache.get_leases('alice')
+    cache.get_leases('bob')
+    assert node.requests == ['/leasing/active/alice', '/leasing/active/bob']
+
+
+def test_expected_transactions_keep_the_addresses(cache, node):
+    cache.expect(transaction('proof'))
+
+    cache.seen({'proofs': ['proof'], 'sender': 'alice', 'recipient': 'bob'})
+    cache.seen({'proofs': ['proof'], 'sender': 'alice', 'recipient': 'bob'})  # The block is scanned again
+
+    cache.get_leases('alice')
+    assert node.requests == []
+
+
+def test_an_abandoned_transaction_is_unexpected(cache, node):
+    cache.expect(transaction('proof'))
+    cache.abandon(transaction('proof'))
+
+    cache.seen({'proofs': ['proof'], 'sender': 'alice'})
+
+    assert cache.expected == set()
+    cache.get_leases('alice')
+    assert node.requests == ['/leasing/active/alice']
+
+
+class Broadcastable:
+    def __init__(self, proof, error=None):
+        self.proofs = [proof]
+        self.error = error
+
+    def broadcast_to(self, node):
+        if self.error:
+            raise self.error
+        return SimpleNamespace(id='tx-%s' % self.proofs[0])
+
+
+@pytest.fixture
+def context(cache):
+    return SimpleNamespace(relations=cache, tx_ids=[])
+
+
+def test_a_rejected_broadcast_is_abandoned(context, cache):
+    with pytest.raises(ValueError):
+        tools.broadcast_async(context, Broadcastable('proof', ValueError('rejected')))
+
+    assert cache.expected == set()
+
+
+def test_an_unconfirmed_broadcast_is_abandoned(context, cache, monkeypatch):
+    watched = Future()
+    monkeypatch.setattr(tools.TRACKER, 'watch', lambda id: watched)
+
+    future = tools.broadcast_async(context, Broadcastable('proof'))
+    assert cache.expected == {'proof'}
+
+    watched.set_exception(TimeoutError('not confirmed'))
+    with pytest.raises(TimeoutError):
+        future.result(1)
+    assert cache.expected == set()
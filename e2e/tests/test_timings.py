@@ -0,0 +1,90 @@
+import json
+import pytest
+
+from e2e.common import timings
+from e2e.common.timings import TimingHistory, modified_z_score, normalized
+
+
+def history_file(tmp_path, key, values):
+    path = tmp_path / 'timings.json'
+    path.write_text(json.dumps({key: [{'duration': v, 'blocks': 1, 'normalized': v} for v in values]}))
+    return str(path)
+
+
+def test_normalized_by_blocks():
+    assert normalized(12.0, 4) == 3.0
+    assert normalized(12.0, 0) == 12.0
+
+
+def test_modified_z_score_uses_median_and_mad():
+    history = [10.0, 10.5, 9.5, 10.0, 11.0, 9.0]
+    # median 10, MAD 0.5
+    assert modified_z_score(10.0, history) == 0
+    assert modified_z_score(12.0, history) == pytest.approx(2.0 / (timings.MAD_SCALE * 0.5))
+
+
+def test_modified_z_score_ignores_an_outlier_in_the_history():
+    assert modified_z_score(13.0, [10.0, 10.2, 9.8, 10.1, 9.9, 100.0]) > timings.THRESHOLD
+
+
+def test_modified_z_score_has_a_minimum_spread():
+    # A constant history has no deviation at all; jitter of a few percent isn't a regression
+    assert modified_z_score(10.3, [10.0] * 10) == pytest.approx(0.3 / (timings.MIN_SPREAD * 10.0))
+    assert modified_z_score(0.015, [0.001] * 10) == pytest.approx(0.014 / timings.MIN_SPREAD_SECONDS)
+
+
+def test_regression_is_flagged(tmp_path):
+    key = 'memory:scenario:Feature > Scenario'
+    history = TimingHistory(history_file(tmp_path, key, [1.0, 1.1, 0.9, 1.0, 1.05]), 'memory')
+
+    history.record_scenario('Feature', 'Scenario', 4.0, 2)
+    found = history.regressions()
+
+    assert [(name, entry['normalized']) for _, name, entry, _ in found] == [('Feature > Scenario', 2.0)]
+    assert history.report()[0] == 'Timing regressions:'
+
+
+def test_no_regression_within_the_spread(tmp_path):
+    key = 'memory:scenario:Feature > Scenario'
+    history = TimingHistory(history_file(tmp_path, key, [1.0, 1.1, 0.9, 1.0, 1.05]), 'memory')
+
+    history.record_scenario('Feature', 'Scenario', 1.1, 1)
+
+    assert history.regressions() == []
+    assert history.report() == []
+
+
+def test_no_check_without_enough_runs(tmp_path):
+    key = 'memory:scenario:Feature > Scenario'
+    history = TimingHistory(history_file(tmp_path, key, [1.0] * (timings.MIN_RUNS - 1)), 'memory')
+
+    history.record_scenario('Feature', 'Scenario', 100.0, 1)
+
+    assert history.regressions() == []
+
+
+def test_history_is_kept_per_node(tmp_path):
+    path = history_file(tmp_path, 'memory:scenario:Feature > Scenario', [1.0] * 10)
+    history = TimingHistory(path, 'docker')
+
+    history.record_scenario('Feature', 'Scenario', 100.0, 1)
+
+    assert history.regressions() == []
+
+
+def test_write_merges_and_keeps_the_last_runs(tmp_path):
+    key = 'memory:feature:Feature'
+    path = history_file(tmp_path, key, [float(i) for i in range(timings.KEEP)])
+
+    first, second = TimingHistory(path, 'memory'), TimingHistory(path, 'memory')
+    first.record_feature('Feature', 100.0, 1)
+    second.record_scenario('Feature', 'Scenario', 1.0, 1)
+    first.write()
+    second.write()
+
+    with open(path) as f:
+        written = json.load(f)
+    assert len(written[key]) == timings.KEEP
+    assert written[key][0]['normalized'] == 1.0
+    assert written[key][-1]['normalized'] == 100.0
+    assert written['memory:scenario:Feature > Scenario'] == [{'duration': 1.0, 'blocks': 1, 'normalized': 1.0}]
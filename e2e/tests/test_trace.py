@@ -0,0 +1,77 @@
+import threading
+import pytest
+
+from e2e.common import trace
+from e2e.common.trace import Trace
+
+
+class FakeNode:
+    def request(self, endpoint, *args, **kwargs):
+        return endpoint
+
+
+@pytest.fixture
+def enabled(tmp_path, monkeypatch):
+    # `install` patches the signing methods of the lto library; restore them afterwards
+    from lto.transaction import Transaction
+    monkeypatch.setattr(Transaction, 'sign_with', Transaction.sign_with)
+    monkeypatch.setattr(Transaction, 'sponsor_with', Transaction.sponsor_with)
+    monkeypatch.setattr(trace, 'TRACE', None)
+
+    node = FakeNode()
+    return trace.enable(str(tmp_path / 'trace.json'), node), node
+
+
+def test_endpoints_are_grouped():
+    assert trace._endpoint('/addresses/balance/3MuGhH9sHixWytCth7uft2YUj4fECtj1y3D') == '/addresses/balance/{id}'
+    assert trace._endpoint('/blocks/at/12?x=1') == '/blocks/at/{n}'
+
+
+def test_phase_does_nothing_when_disabled(monkeypatch):
+    monkeypatch.setattr(trace, 'TRACE', None)
+    with trace.phase('wait'):
+        pass
+
+
+def test_requests_and_phases_are_recorded_per_step(enabled):
+    recorder, node = enabled
+
+    recorder.start_step('Feature', 'Scenario', 'Given a step')
+    node.request('/blocks/height')
+    with trace.phase('wait'):
+        pass
+    recorder.end_step('passed')
+
+    step, = recorder.steps
+    assert step['status'] == 'passed'
+    assert [endpoint for endpoint, _ in step['requests']] == ['/blocks/height']
+    assert set(step['phases']) == {'http', 'wait', 'other'}
+    assert sum(step['phases'].values()) == pytest.approx(step['duration'])
+
+
+def test_nested_steps_add_their_phases_to_the_outer_step():
+    recorder = Trace(None)
+
+    recorder.start_step('Feature', 'Scenario', 'outer')
+    recorder.start_step('Feature', 'Scenario', 'inner')
+    recorder.record('sign', 0.5)
+    recorder.end_step('passed')
+    recorder.end_step('passed')
+
+    inner, outer = recorder.steps
+    assert inner['depth'] == 1 and outer['depth'] == 0
+    assert outer['phases']['sign'] == 0.5
+
+
+def test_background_threads_and_hooks_are_not_recorded():
+    recorder = Trace(None)
+    recorder.record('http', 1.0, '/blocks/height')  # Outside of a step
+
+    recorder.start_step('Feature', 'Scenario', 'step')
+    thread = threading.Thread(target=recorder.record, args=('http', 1.0, '/blocks/height'))
+    thread.start()
+    thread.join()
+    recorder.end_step('passed')
+
+    assert 'http' not in recorder.steps[0]['phases']
+    assert not recorder.endpoints
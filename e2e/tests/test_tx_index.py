@@ -0,0 +1,108 @@
+from urllib.parse import urlparse, parse_qs
+import pytest
+from lto.accounts import AccountFactoryED25519
+from lto.transactions import Anchor
+
+from e2e.common.tx_index import TransactionIndex
+
+ACCOUNT = AccountFactoryED25519('T').create()
+
+
+class FakeNode:
+    """Serves the transactions of an address newest first, a page at a time, like the node."""
+
+    def __init__(self):
+        self.transactions = []
+        self.requests = []
+
+    def add_anchor(self, *hashes):
+        tx = Anchor(*hashes)
+        tx.timestamp = len(self.transactions) + 1
+        tx.sign_with(ACCOUNT)
+        data = tx.to_json()
+        data['id'] = 'tx%d' % len(self.transactions)
+        self.transactions.append(data)
+        return data
+
+    def request(self, endpoint):
+        self.requests.append(endpoint)
+        query = parse_qs(urlparse(endpoint).query)
+        limit, offset = int(query['limit'][0]), int(query['offset'][0])
+        newest_first = list(reversed(self.transactions))
+        return [newest_first[offset:offset + limit]]
+
+
+def anchor_hash(i):
+    return bytes([i]) * 32
+
+
+@pytest.fixture
+def node():
+    return FakeNode()
+
+
+def test_first_refresh_pages_through_the_whole_history(node):
+    for i in range(5):
+        node.add_anchor(anchor_hash(i))
+    index = TransactionIndex(node, page_size=2)
+
+    entries = index.refresh(ACCOUNT.address, 'anchor')
+
+    assert len(entries) == 5
+    assert [parse_qs(urlparse(r).query)['offset'] for r in node.requests] == [['0'], ['2'], ['4']]
+    assert index.entries[(ACCOUNT.address, 'anchor')]['latest'] == 'tx4'
+
+
+def test_refresh_stops_at_the_last_transaction_seen(node):
+    for i in range(4):
+        node.add_anchor(anchor_hash(i))
+    index = TransactionIndex(node, page_size=2)
+    index.refresh(ACCOUNT.address, 'anchor')
+
+    node.requests.clear()
+    new = node.add_anchor(anchor_hash(4))
+    entries = index.refresh(ACCOUNT.address, 'anchor')
+
+    assert len(node.requests) == 1
+    assert len(entries) == 5
+    assert index.entries[(ACCOUNT.address, 'anchor')] == {'latest': new['id'], 'count': 5, 'index': entries}
+
+
+def test_refresh_without_new_transactions_fetches_one_page(node):
+    for i in range(3):
+        node.add_anchor(anchor_hash(i))
+    index = TransactionIndex(node, page_size=2)
+    index.refresh(ACCOUNT.address, 'anchor')
+
+    node.requests.clear()
+    index.refresh(ACCOUNT.address, 'anchor')
+
+    assert len(node.requests) == 1
+    assert index.entries[(ACCOUNT.address, 'anchor')]['count'] == 3
+
+
+def test_lookup_by_anchor_hash(node):
+    node.add_anchor(anchor_hash(1), anchor_hash(2))
+    index = TransactionIndex(node)
+
+    tx = index.anchor(ACCOUNT.address, Anchor(anchor_hash(2)).anchors[0].base58())
+
+    assert tx is not None and tx.timestamp == 1
+    assert index.anchor(ACCOUNT.address, Anchor(anchor_hash(3)).anchors[0].base58()) is None
+
+
+def test_newest_transaction_wins_for_a_repeated_key(node):
+    for _ in range(3):
+        node.add_anchor(anchor_hash(7))
+    index = TransactionIndex(node, page_size=2)
+
+    tx = index.anchor(ACCOUNT.address, Anchor(anchor_hash(7)).anchors[0].base58())
+
+    assert tx.timestamp == 3
+
+
+def test_no_index_for_other_transaction_types(node):
+    node.add_anchor(anchor_hash(1))
+
+    with pytest.raises(ValueError):
+        TransactionIndex(node).refresh(ACCOUNT.address, 'transfer')
@@ -0,0 +1,41 @@
+from e2e.common.utx_load import overtaken
+
+
+def record(id, sent, height):
+    return {'id': id, 'sent': sent, 'height': height}
+
+
+BACKLOG = [record('b%d' % i, i, 10 + i // 4) for i in range(12)]  # Four per block, at heights 10 to 12
+
+
+def test_ordered_by_fee():
+    high = [record('h0', 20, 11), record('h1', 21, 11)]
+
+    assert overtaken(high, BACKLOG, height=10) == []
+
+
+def test_fifo_is_overtaken_by_the_backlog():
+    high = [record('h0', 20, 13)]
+
+    ids = [earlier['id'] for _, earlier in overtaken(high, BACKLOG, height=10)]
+    assert ids == ['b%d' % i for i in range(4, 12)]
+
+
+def test_blocks_up_to_the_broadcast_height_dont_count():
+    high = [record('h0', 20, 12)]
+
+    assert overtaken(high, BACKLOG, height=11) == []
+
+
+def test_only_the_backlog_broadcast_before_counts():
+    high = [record('h0', 6, 12)]
+    backlog = BACKLOG + [record('late', 30, 11)]
+
+    assert [earlier['id'] for _, earlier in overtaken(high, backlog, height=10)] == ['b4', 'b5']
+
+
+def test_an_unconfirmed_transaction_is_overtaken_by_the_later_backlog():
+    high = [record('h0', 20, None)]
+    backlog = [record('b0', 0, 11), record('b1', 1, None)]
+
+    assert [earlier['id'] for _, earlier in overtaken(high, backlog, height=10)] == ['b0']
@@ -1,6 +1,7 @@
 #!/bin/bash
+set -e
 
 /usr/bin/python3 "/lto-node/starter.py"
 
 echo "Node is starting..."
-${JAVA_HOME}/bin/java -Dlogback.stdout.level="${LTO_LOG_LEVEL}" "-Xmx${LTO_HEAP_SIZE}" -jar "/lto-node/lto-public-all.jar" $LTO_CONFIG_FILE
+${JAVA_HOME}/bin/java -Dlogback.stdout.level="${LTO_LOG_LEVEL}" $(cat /lto/configs/jvm-options) $LTO_JAVA_OPTS -jar "/lto-node/lto-public-all.jar" $LTO_CONFIG_FILE
@@ -1,16 +1,51 @@
 #!/usr/bin/env python3
 
 # Vote to increase, maintain, or decrease the fee, based on the current price of LTO in USD.
-# This script should be run a cron job once an hour.
+# This script should be run a cron job once an hour, or as a daemon with `--daemon`.
 
 import requests
+import json
 import os
 import sys
+import threading
+import time
+from concurrent.futures import Future, wait
 
-def coingecko_price() -> float:
-    response = requests.get(
+TIMEOUT = float(os.environ.get('LTO_FEE_VOTE_TIMEOUT', 5))       # Budget for all requests of a single run
+PRICE_TTL = int(os.environ.get('LTO_FEE_PRICE_TTL', 1800))        # Cached prices are used without asking the provider
+PRICE_MAX_AGE = int(os.environ.get('LTO_FEE_PRICE_MAX_AGE', 21600))  # Expired prices are used if the provider fails
+POLL_INTERVAL = int(os.environ.get('LTO_FEE_VOTE_POLL', 60))      # Daemon: seconds between checks of the height
+PERIOD_MARGIN = int(os.environ.get('LTO_FEE_VOTE_MARGIN', 10))    # Daemon: blocks before a period ends to vote again
+
+# Connections are kept alive between runs of the daemon
+SESSION = requests.Session()
+
+def request_timeout(deadline: float):
+    # Connect and read timeouts that end at the deadline. The read timeout applies to every read of the socket, so a
+    # response that trickles in can take longer; the budget of a run is enforced by evaluate, not by these timeouts.
+    remaining = max(deadline - time.monotonic(), 0.1)
+    return remaining / 2, remaining / 2
+
+
+def submit(fn, *args) -> Future:
+    # Run the request in a daemon thread, so one that is still running when the budget is spent is abandoned: it holds
+    # up neither the vote nor the exit of the interpreter.
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except Exception as err:
+            future.set_exception(err)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def coingecko_price(deadline: float) -> float:
+    response = SESSION.get(
         "https://api.coingecko.com/api/v3/simple/price?ids=lto-network&vs_currencies=usd",
-        timeout=5
+        timeout=request_timeout(deadline)
     )
     response.raise_for_status()
 
@@ -23,11 +58,11 @@ def coingecko_price() -> float:
     return data['lto-network']['usd']
 
 
-def coinmarketcap_price(api_key: str) -> float:
-    response = requests.get(
+def coinmarketcap_price(api_key: str, deadline: float) -> float:
+    response = SESSION.get(
         "https://pro-api.coinmarketcap.com/v2/tools/price-conversion?amount=1&symbol=lto&convert=usd",
         headers={"X-CMC_PRO_API_KEY": api_key},
-        timeout=5
+        timeout=request_timeout(deadline)
     )
     response.raise_for_status()
 
@@ -35,8 +70,8 @@ def coinmarketcap_price(api_key: str) -> float:
     return data['data'][0]['quote']['USD']['price']
 
 
-def fetch_price(node: str) -> int:
-    response = requests.get("%s/fees/status" % node, timeout=5)
+def fetch_price(node: str, deadline: float) -> int:
+    response = SESSION.get("%s/fees/status" % node, timeout=request_timeout(deadline))
     response.raise_for_status()
 
     # Make decision based on next price, not current one. Don't increase the price if it's already increasing.
@@ -44,6 +79,51 @@ def fetch_price(node: str) -> int:
     return data['next']['price']
 
 
+def read_cache(file: str) -> dict:
+    try:
+        with open(file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_cache(file: str, cache: dict):
+    # Write to a temporary file and rename it, so an interrupted run never leaves a corrupt cache behind
+    tmp = "%s.tmp" % file
+    with open(tmp, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp, file)
+
+
+def cached_price(cache: dict, provider: str, max_age: int):
+    entry = cache.get(provider)
+    if entry and time.time() - entry['time'] < max_age:
+        return entry['price']
+    return None
+
+
+def collect_price(cache: dict, provider: str, future) -> float:
+    """
+    Price of a provider. A price that is still fresh isn't fetched at all. If fetching fails or doesn't finish within
+    the time budget, an expired price is used as long as it's not older than PRICE_MAX_AGE.
+    """
+    if future is None:
+        return cached_price(cache, provider, PRICE_MAX_AGE)
+
+    if future.done() and future.exception() is None:
+        price = future.result()
+        cache[provider] = {'price': price, 'time': time.time()}
+        return price
+
+    error = future.exception() if future.done() else "timeout"
+    price = cached_price(cache, provider, PRICE_MAX_AGE)
+    if price is None:
+        raise Exception("Failed to get price from %s: %s" % (provider, error))
+
+    print("Failed to get price from %s (%s), using cached price %f" % (provider, error, price))
+    return price
+
+
 def determine_vote(target: int, current: int):
     if target < current / 1.1:
         return 'decrease'
@@ -54,15 +134,50 @@ def determine_vote(target: int, current: int):
 
 
 def write_vote(file: str, vote: str):
-    with open(file, 'w') as f:
-        f.write(vote)
+    # The node reloads the file when it's written, so only write it if the vote changed. Rename a temporary file, so
+    # the node never reads a partially written vote.
+    try:
+        with open(file) as f:
+            if f.read() == vote:
+                return
+    except OSError:
+        pass
 
+    tmp = "%s.tmp" % file
+    with open(tmp, 'w') as f:
+        f.write(vote)
+    os.replace(tmp, file)
 
-def main(node: str, file: str):
-    price = coingecko_price()
 
+def evaluate(node: str, file: str) -> str:
+    cache_file = os.environ.get('LTO_FEE_PRICE_CACHE', "%s.price.json" % file)
+    cache = read_cache(cache_file)
     cmc_api_key = os.environ.get('COINMARKETCAP_API_KEY')
-    cmc_price = coinmarketcap_price(cmc_api_key) if cmc_api_key else None
+
+    # Fetch the prices that are no longer fresh and the fee status of the node at the same time
+    deadline = time.monotonic() + TIMEOUT
+    futures = {'node': submit(fetch_price, node, deadline), 'coingecko': None, 'coinmarketcap': None}
+    if cached_price(cache, 'coingecko', PRICE_TTL) is None:
+        futures['coingecko'] = submit(coingecko_price, deadline)
+    if cmc_api_key and cached_price(cache, 'coinmarketcap', PRICE_TTL) is None:
+        futures['coinmarketcap'] = submit(coinmarketcap_price, cmc_api_key, deadline)
+
+    wait([future for future in futures.values() if future], timeout=max(deadline - time.monotonic(), 0))
+
+    # Keep the price of one provider, even if the other one fails
+    prices = {'coinmarketcap': None}
+    errors = []
+    for provider in ('coingecko', 'coinmarketcap') if cmc_api_key else ('coingecko',):
+        try:
+            prices[provider] = collect_price(cache, provider, futures[provider])
+        except Exception as err:
+            errors.append(err)
+    write_cache(cache_file, cache)
+    if errors:
+        raise errors[0]
+
+    price = prices['coingecko']
+    cmc_price = prices['coinmarketcap']
 
     if cmc_price and abs(price - cmc_price) > 0.1 * price:
         vote = 'remain'
@@ -70,21 +185,71 @@ def main(node: str, file: str):
     else:
         target = int(os.environ.get('LTO_FEE_TARGET', 20000)) / price
         max_target = int(os.environ.get('LTO_FEE_MAX_PRICE', 100000))
-        current = fetch_price(node)
+        if not futures['node'].done():
+            raise Exception("Failed to get fee status from %s: timeout" % node)
+        current = futures['node'].result()
         vote = determine_vote(min(target, max_target), current)
         print("target: %d, current: %d, vote: %s" % (target, current, vote))
 
-    write_vote(file, vote)
+    return vote
+
+
+def main(node: str, file: str):
+    write_vote(file, evaluate(node, file))
+
+
+def fetch_period(node: str) -> int:
+    response = SESSION.get("%s/fees/status" % node, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()['period']
+
+
+def fetch_height(node: str) -> int:
+    response = SESSION.get("%s/blocks/height" % node, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()['height']
+
+
+def vote_moment(height: int, period: int):
+    # The period and whether it's about to end; the daemon votes whenever this changes
+    return height // period, height % period >= period - PERIOD_MARGIN
+
+
+def daemon(node: str, file: str):
+    """
+    Vote once at the start of each fee vote period, when the price of the next period is known, and once more when the
+    period is about to end. In between, only the height is polled. The vote file is deleted by the node when it starts,
+    so a missing file is written right away.
+    """
+    period = None
+    voted = None
+
+    while True:
+        try:
+            period = period or fetch_period(node)
+            height = fetch_height(node)
+            moment = vote_moment(height, period)
+
+            if moment != voted or not os.path.exists(file):
+                write_vote(file, evaluate(node, file))
+                voted = moment
+        except Exception as err:
+            print(err, file=sys.stderr)
+
+        time.sleep(POLL_INTERVAL)
 
 
 if __name__ == '__main__':
-    if (len(sys.argv) < 3):
-        print("USAGE: fee-vote NODE_URL PATH")
+    args = [arg for arg in sys.argv[1:] if arg != '--daemon']
+    if (len(args) < 2):
+        print("USAGE: fee-vote [--daemon] NODE_URL PATH")
         sys.exit(1)
 
+    if '--daemon' in sys.argv:
+        daemon(args[0], args[1])
 
     try:
-        main(sys.argv[1], sys.argv[2])
+        main(args[0], args[1])
         sys.exit(0)
     except Exception as err:
         print(err, file=sys.stderr)
@@ -52,14 +52,19 @@ object Importer extends ScorexLogging {
       override def close(): Unit                                                                 = {}
     }
 
+    // Signatures of blocks and transactions up to the trusted height aren't checked, but account scripts are executed.
+    // Only use this for an export from a trusted source.
+    val trustedHeight = Try(args(2)).toOption.flatMap(s => Try(s.toInt).toOption).getOrElse(0)
+
     Try(args(1)) match {
       case Success(filename) =>
         log.info(s"Loading file '$filename'")
+        if (trustedHeight > 0) log.info(s"Not checking signatures up to height $trustedHeight")
 
         createInputStream(filename) match {
           case Success(inputStream) =>
             val db                = openDB(settings.dataDirectory)
-            val blockchainUpdater = StorageFactory(settings, db, NTP)
+            val blockchainUpdater = StorageFactory.forImport(settings, db, NTP, trustedHeight)
             val pos               = new PoSSelector(blockchainUpdater, settings.blockchainSettings)
             val checkpoint        = new CheckpointServiceImpl(db, settings.checkpointsSettings)
             val extAppender       = BlockAppender(checkpoint, blockchainUpdater, NTP, utxPoolStub, pos, settings, scheduler) _
@@ -70,6 +75,9 @@ object Importer extends ScorexLogging {
             val start        = System.currentTimeMillis()
             var counter      = 0
             var blocksToSkip = blockchainUpdater.height - 1
+            val fileSize     = new File(filename).length()
+            var bytesRead    = 0L
+            var lastProgress = start
 
             println(s"Skipping $blocksToSkip blocks(s)")
 
@@ -79,6 +87,7 @@ object Importer extends ScorexLogging {
                 val len    = Ints.fromByteArray(lenBytes)
                 val buffer = new Array[Byte](len)
                 val s2     = bis.read(buffer)
+                bytesRead += Ints.BYTES + s2
                 if (s2 == len) {
                   if (blocksToSkip > 0) {
                     blocksToSkip -= 1
@@ -93,6 +102,10 @@ object Importer extends ScorexLogging {
                           counter = counter + 1
                       }
                     }
+                    if (System.currentTimeMillis() - lastProgress >= ProgressInterval) {
+                      lastProgress = System.currentTimeMillis()
+                      logProgress(blockchainUpdater.height, counter, bytesRead, fileSize, lastProgress - start)
+                    }
                   }
                 } else {
                   println(s"$s2 != expected $len")
@@ -107,12 +120,22 @@ object Importer extends ScorexLogging {
             inputStream.close()
             val duration = System.currentTimeMillis() - start
             log.info(s"Imported $counter block(s) in ${humanReadableDuration(duration)}")
+            logProgress(blockchainUpdater.height, counter, bytesRead, fileSize, duration)
           case Failure(ex) => log.error(s"Failed to open file '$filename")
         }
       case Failure(ex) => log.error(s"Failed to get input filename from second parameter: $ex")
     }
   }
 
+  private val ProgressInterval = 10000L
+
+  private def logProgress(height: Int, blocks: Int, bytes: Long, fileSize: Long, duration: Long): Unit = {
+    val seconds = Math.max(duration, 1) / 1000.0
+    log.info(
+      f"Height $height, ${bytes * 100.0 / Math.max(fileSize, 1)}%.1f%% of the file, ${blocks / seconds}%.0f blocks/s, " +
+        f"${bytes / seconds / 1024 / 1024}%.1f MiB/s")
+  }
+
   def createInputStream(filename: String): Try[FileInputStream] =
     Try {
       new FileInputStream(filename)
@@ -10,17 +10,31 @@ import org.iq80.leveldb.DB
 object StorageFactory extends ScorexLogging {
   private val StorageVersion = 1
 
-  def apply(settings: LtoSettings, db: DB, time: Time): BlockchainUpdater with NG = {
+  def apply(settings: LtoSettings, db: DB, time: Time): BlockchainUpdater with NG =
+    new BlockchainUpdaterImpl(writer(settings, db), settings, time)
+
+  /**
+    * Storage for the Importer. Blocks up to `trustedHeight` are appended without checking the signatures of the block
+    * and its transactions (account scripts are still executed), so only use it for an export from a trusted source.
+    */
+  def forImport(settings: LtoSettings, db: DB, time: Time, trustedHeight: Int): BlockchainUpdater with NG = {
+    val trusted = trustedHeight
+    new BlockchainUpdaterImpl(writer(settings, db), settings, time) {
+      override protected def trustedHeight: Int = trusted
+    }
+  }
+
+  private def writer(settings: LtoSettings, db: DB) = {
     checkVersion(db)
-    val levelDBWriter = new LevelDBWriter(
+    new LevelDBWriter(
       db,
       settings.blockchainSettings.functionalitySettings,
       settings.maxCacheSize,
       settings.maxRollbackDepth,
       settings.indexAllTransactions,
     )
-    new BlockchainUpdaterImpl(levelDBWriter, settings, time)
   }
+
   private def checkVersion(db: DB) = {
     val rw      = new RW(db)
     val version = rw.get(Keys.version)
@@ -23,7 +23,7 @@ object BlockDiffer extends ScorexLogging with Instrumented {
                                                 maybePrevBlock: Option[Block],
                                                 block: Block,
                                                 constraint: Constraint,
-                                                verify: Boolean = true): Either[ValidationError, (Diff, Long, Constraint)] = {
+                                                verifySignatures: Boolean = true): Either[ValidationError, (Diff, Long, Constraint)] = {
     val stateHeight = blockchain.height
     val blockGenerator = block.signerData.generator
 
@@ -37,7 +37,7 @@ object BlockDiffer extends ScorexLogging with Instrumented {
     )
 
     for {
-      _ <- if (verify) block.signaturesValid() else Right(())
+      _ <- if (verifySignatures) block.signaturesValid() else Right(())
       r <- apply(
         settings,
         blockchain,
@@ -47,7 +47,8 @@ object BlockDiffer extends ScorexLogging with Instrumented {
         blockGenerator,
         block.timestamp,
         block.transactionData,
-        stateHeight + 1
+        stateHeight + 1,
+        verifySignatures
       )
     } yield r
   }
@@ -71,7 +72,8 @@ object BlockDiffer extends ScorexLogging with Instrumented {
         micro.sender,
         timestamp,
         micro.transactionData,
-        blockchain.height
+        blockchain.height,
+        verifySignatures = true
       )
     } yield r
   }
@@ -87,9 +89,10 @@ object BlockDiffer extends ScorexLogging with Instrumented {
                                                     blockGenerator: Address,
                                                     timestamp: Long,
                                                     txs: Seq[Transaction],
-                                                    currentBlockHeight: Int
+                                                    currentBlockHeight: Int,
+                                                    verifySignatures: Boolean
   ): Either[ValidationError, (Diff, Long, Constraint)] = {
-    val txDiffer = TransactionDiffer(settings, prevBlockTimestamp, timestamp, currentBlockHeight) _
+    val txDiffer = TransactionDiffer(settings, prevBlockTimestamp, timestamp, currentBlockHeight, verifySignatures) _
 
     txs
       .foldLeft((initDiff, 0L, initConstraint).asRight[ValidationError]) {
@@ -24,12 +24,14 @@ object TransactionDiffer {
 
   case class TransactionValidationError(cause: ValidationError, tx: Transaction) extends ValidationError
 
-  def apply(settings: FunctionalitySettings, prevBlockTimestamp: Option[Long], currentBlockTimestamp: Long, currentBlockHeight: Int)(
-      blockchain: Blockchain,
-      tx: Transaction): Either[ValidationError, Diff] = {
+  def apply(settings: FunctionalitySettings,
+            prevBlockTimestamp: Option[Long],
+            currentBlockTimestamp: Long,
+            currentBlockHeight: Int,
+            verifySignatures: Boolean = true)(blockchain: Blockchain, tx: Transaction): Either[ValidationError, Diff] = {
     for {
       _ <- CommonValidation.disallowUnsupportedKeyTypes(blockchain, currentBlockHeight, tx)
-      _ <- Verifier(blockchain, currentBlockHeight)(tx)
+      _ <- Verifier(blockchain, currentBlockHeight, verifySignatures)(tx)
       _ <- CommonValidation.disallowTxFromFuture(settings, currentBlockTimestamp, tx)
       _ <- CommonValidation.disallowTxFromPast(prevBlockTimestamp, tx)
       _ <- CommonValidation.disallowBeforeActivationTime(blockchain, currentBlockHeight, tx)
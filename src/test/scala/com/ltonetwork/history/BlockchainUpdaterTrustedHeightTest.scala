@@ -0,0 +1,84 @@
+package com.ltonetwork.history
+
+import java.nio.file.Files
+
+import com.ltonetwork.db.openDB
+import com.ltonetwork.state._
+import com.ltonetwork.state.diffs._
+import com.ltonetwork.transaction.genesis.GenesisTransaction
+import com.ltonetwork.transaction.transfer._
+import com.ltonetwork.{TestHelpers, TestTime, TransactionGen}
+import org.scalacheck.Gen
+import org.scalatest.Assertion
+import org.scalatest.matchers.should.Matchers
+import org.scalatest.propspec.AnyPropSpec
+import org.scalatestplus.scalacheck.ScalaCheckDrivenPropertyChecks
+
+class BlockchainUpdaterTrustedHeightTest extends AnyPropSpec with ScalaCheckDrivenPropertyChecks with Matchers with TransactionGen {
+
+  val preconditionsAndPayments: Gen[(GenesisTransaction, TransferTransaction, TransferTransaction)] = for {
+    master    <- accountGen
+    recipient <- accountGen
+    ts        <- positiveIntGen
+    genesis: GenesisTransaction = GenesisTransaction.create(master, ENOUGH_AMT, ts).explicitGet()
+    payment: TransferTransaction  <- ltoTransferGeneratorP(ts, master, recipient)
+    payment2: TransferTransaction <- ltoTransferGeneratorP(ts, master, recipient)
+  } yield (genesis, payment, payment2)
+
+  private def importScenario(trustedHeight: Int)(assertion: (Domain, (GenesisTransaction, TransferTransaction, TransferTransaction)) => Assertion) =
+    forAll(preconditionsAndPayments) { s =>
+      val path = Files.createTempDirectory("leveldb-test")
+      val db   = openDB(path.toAbsolutePath.toString)
+      val bcu  = StorageFactory.forImport(DefaultLtoSettings, db, new TestTime(), trustedHeight)
+      try assertion(Domain(bcu), s)
+      finally {
+        bcu.shutdown()
+        db.close()
+        TestHelpers.deleteRecursively(path)
+      }
+    }
+
+  property("can apply a block with an invalid signature up to the trusted height") {
+    importScenario(trustedHeight = 2) {
+      case (domain, (genesis, payment, _)) =>
+        val blocks = chainBlocks(Seq(Seq(genesis), Seq(payment)))
+        domain.blockchainUpdater.processBlock(blocks.head) shouldBe 'right
+        domain.blockchainUpdater.processBlock(spoilSignature(blocks.last)) shouldBe 'right
+    }
+  }
+
+  property("can't apply a block with an invalid signature above the trusted height") {
+    importScenario(trustedHeight = 1) {
+      case (domain, (genesis, payment, _)) =>
+        val blocks = chainBlocks(Seq(Seq(genesis), Seq(payment)))
+        domain.blockchainUpdater.processBlock(blocks.head) shouldBe 'right
+        domain.blockchainUpdater.processBlock(spoilSignature(blocks.last)) should produce("InvalidSignature")
+    }
+  }
+
+  property("checks the signature of the referenced forged block above the trusted height") {
+    importScenario(trustedHeight = 2) {
+      case (domain, (genesis, payment, payment2)) =>
+        val blocks = chainBlocks(Seq(Seq(genesis), Seq(payment)))
+        val spoiled = spoilSignature(blocks.last)
+        domain.blockchainUpdater.processBlock(blocks.head) shouldBe 'right
+        domain.blockchainUpdater.processBlock(spoiled) shouldBe 'right
+
+        val block2 = buildBlockOfTxs(spoiled.uniqueId, Seq(payment2), genesis.timestamp)
+        domain.blockchainUpdater.processBlock(block2) should produce("Forged block has invalid signature")
+    }
+  }
+
+  property("doesn't check the signature of the referenced forged block up to the trusted height") {
+    importScenario(trustedHeight = 3) {
+      case (domain, (genesis, payment, payment2)) =>
+        val blocks = chainBlocks(Seq(Seq(genesis), Seq(payment)))
+        val spoiled = spoilSignature(blocks.last)
+        domain.blockchainUpdater.processBlock(blocks.head) shouldBe 'right
+        domain.blockchainUpdater.processBlock(spoiled) shouldBe 'right
+
+        val block2 = buildBlockOfTxs(spoiled.uniqueId, Seq(payment2), genesis.timestamp)
+        domain.blockchainUpdater.processBlock(block2) shouldBe 'right
+    }
+  }
+}
@@ -0,0 +1,105 @@
+package com.ltonetwork.state.diffs
+
+import com.ltonetwork.block.{Block, TestBlock}
+import com.ltonetwork.db.WithState
+import com.ltonetwork.lang.v1.compiler.Terms.FALSE
+import com.ltonetwork.mining.MiningConstraint
+import com.ltonetwork.settings.{FunctionalitySettings, TestFunctionalitySettings}
+import com.ltonetwork.state._
+import com.ltonetwork.state.diffs.smart.smartEnabledFS
+import com.ltonetwork.transaction.Proofs
+import com.ltonetwork.transaction.genesis.GenesisTransaction
+import com.ltonetwork.transaction.smart.SetScriptTransaction
+import com.ltonetwork.transaction.smart.script.v1.ScriptV1
+import com.ltonetwork.transaction.transfer.TransferTransaction
+import com.ltonetwork.utils._
+import com.ltonetwork.{NoShrink, TransactionGen}
+import org.scalacheck.Gen
+import org.scalatestplus.scalacheck.ScalaCheckDrivenPropertyChecks
+import org.scalatest.matchers.should.Matchers
+import org.scalatest.propspec.AnyPropSpec
+
+class VerifySignaturesDiffTest
+    extends AnyPropSpec
+    with ScalaCheckDrivenPropertyChecks
+    with Matchers
+    with TransactionGen
+    with NoShrink
+    with WithState {
+
+  private val fs = TestFunctionalitySettings.Enabled
+
+  val preconditionsAndTransfer: Gen[(GenesisTransaction, TransferTransaction)] = for {
+    master    <- accountGen
+    recipient <- accountGen
+    ts        <- positiveIntGen
+    genesis: GenesisTransaction = GenesisTransaction.create(master, ENOUGH_AMT, ts).explicitGet()
+    transfer: TransferTransaction <- ltoTransferGeneratorP(ts, master, recipient)
+  } yield (genesis, transfer)
+
+  val scriptedAccountAndTransfer: Gen[(GenesisTransaction, SetScriptTransaction, TransferTransaction)] = for {
+    master    <- accountGen
+    recipient <- accountGen
+    ts        <- positiveIntGen
+    genesis: GenesisTransaction = GenesisTransaction.create(master, ENOUGH_AMT, ts).explicitGet()
+    setScript <- selfSignedSetScriptTransactionGenP(master, ScriptV1(FALSE).explicitGet(), ts + 1)
+    transfer: TransferTransaction = TransferTransaction.signed(3, ts + 2, master, 1.lto, recipient, 1, Array.emptyByteArray).explicitGet()
+  } yield (genesis, setScript, transfer)
+
+  private def spoilSignature(b: Block): Block = b.copy(signerData = b.signerData.copy(signature = TestBlock.randomSignature()))
+
+  private def spoilProof(tx: TransferTransaction): TransferTransaction = tx.copy(proofs = Proofs(Seq(TestBlock.randomSignature())))
+
+  private def withGenesis(genesis: GenesisTransaction)(test: Blockchain => Any): Unit = withBlocks(fs, TestBlock.create(Seq(genesis)))(test)
+
+  private def withBlocks(fs: FunctionalitySettings, blocks: Block*)(test: Blockchain => Any): Unit = withStateAndHistory(fs) { state =>
+    blocks.foreach { block =>
+      val (diff, fees, _) = BlockDiffer.fromBlock(fs, state, None, block, MiningConstraint.Unlimited).explicitGet()
+      state.append(diff, fees, block)
+    }
+    test(state)
+  }
+
+  property("BlockDiffer checks the block signature unless verifySignatures is off") {
+    forAll(preconditionsAndTransfer) {
+      case (genesis, transfer) =>
+        withGenesis(genesis) { state =>
+          val block = spoilSignature(TestBlock.create(Seq(transfer)))
+          BlockDiffer.fromBlock(fs, state, None, block, MiningConstraint.Unlimited) should produce("InvalidSignature")
+          BlockDiffer.fromBlock(fs, state, None, block, MiningConstraint.Unlimited, verifySignatures = false) shouldBe 'right
+        }
+    }
+  }
+
+  property("BlockDiffer checks the transaction signatures unless verifySignatures is off") {
+    forAll(preconditionsAndTransfer) {
+      case (genesis, transfer) =>
+        withGenesis(genesis) { state =>
+          val block = TestBlock.create(Seq(spoilProof(transfer)))
+          BlockDiffer.fromBlock(fs, state, None, block, MiningConstraint.Unlimited) should produce("Proof doesn't validate")
+          BlockDiffer.fromBlock(fs, state, None, block, MiningConstraint.Unlimited, verifySignatures = false) shouldBe 'right
+        }
+    }
+  }
+
+  property("TransactionDiffer checks the transaction signature unless verifySignatures is off") {
+    forAll(preconditionsAndTransfer) {
+      case (genesis, transfer) =>
+        withGenesis(genesis) { state =>
+          val tx = spoilProof(transfer)
+          TransactionDiffer(fs, None, tx.timestamp, 2)(state, tx) should produce("Proof doesn't validate")
+          TransactionDiffer(fs, None, tx.timestamp, 2, verifySignatures = false)(state, tx) shouldBe 'right
+        }
+    }
+  }
+
+  property("TransactionDiffer executes the account script when signatures aren't verified") {
+    forAll(scriptedAccountAndTransfer) {
+      case (genesis, setScript, transfer) =>
+        withBlocks(smartEnabledFS, TestBlock.create(Seq(genesis)), TestBlock.create(Seq(setScript))) { state =>
+          TransactionDiffer(smartEnabledFS, None, transfer.timestamp, 3, verifySignatures = false)(state, transfer) should
+            produce("TransactionNotAllowedByScript")
+        }
+    }
+  }
+}
@@ -1,17 +1,62 @@
 import os
 import os.path
-import sys
-from pyhocon import ConfigFactory, HOCONConverter
-import pywaves as pw
-import base58
+import re
 import string
+import sys
 import random
+import subprocess
 from shutil import copyfile
-from pyblake2 import blake2b
 from hashlib import sha256
+from time import monotonic
 
+# pyhocon, base58, pyblake2 and pywaves are imported when needed. Most restarts of a container don't need them.
 
 TRUEISH = ['yes', 'true', 't', '1', 'on']
+HASH_FILE = '/lto/configs/.env-hash'
+JVM_OPTIONS_FILE = '/lto/configs/jvm-options'
+IMPORT_DIR = '/lto/import'
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+
+MIB = 1024 * 1024
+MAX_HEAP_MIB = 31 * 1024  # Up to about 32g the JVM uses compressed object pointers; a bigger heap holds less
+
+# Performance settings per role, selected with LTO_PROFILE. `scale` multiplies the settings derived from the resources
+# of the container (see node_tuning). LTO_ENABLE_REST_API, LTO_ENABLE_MINING and LTO_X__Y variables override a profile.
+PROFILES = {
+    'validator': {
+        'description': 'block generation; REST API off, a lean UTX pool and no extra REST API threads',
+        'rest-api': 'no',
+        'mining': 'yes',
+        'settings': [(['lto', 'utx', 'max-transaction-age'], '30m')],
+        'scale': {'cache': 1, 'utx': 0.25, 'threads': 1},
+    },
+    'gateway': {
+        'description': 'public REST API; mining off, more REST API threads and larger caches',
+        'rest-api': 'yes',
+        'mining': 'no',
+        'settings': [],
+        'scale': {'cache': 2, 'utx': 1, 'threads': 4},
+    },
+    'archive': {
+        'description': 'explorers and indexers; all transactions indexed per address, mining off and the largest caches',
+        'rest-api': 'yes',
+        'mining': 'no',
+        'settings': [(['lto', 'index-all-transactions'], 'yes')],
+        'scale': {'cache': 4, 'utx': 1, 'threads': 2},
+    },
+}
+DEFAULT_SCALE = {'cache': 1, 'utx': 1, 'threads': 1}
+UNLIMITED_MEMORY = 1 << 60  # cgroup v1 reports "no limit" as a huge number
+
+# Options per LTO_GC value. ZGC and Shenandoah are experimental in JDK 11, and Shenandoah is missing from some builds.
+GC_OPTIONS = {
+    'g1': ['-XX:+UseG1GC'],
+    'serial': ['-XX:+UseSerialGC'],
+    'parallel': ['-XX:+UseParallelGC'],
+    'z': ['-XX:+UnlockExperimentalVMOptions', '-XX:+UseZGC'],
+    'shenandoah': ['-XX:+UnlockExperimentalVMOptions', '-XX:+UseShenandoahGC'],
+}
 
 
 def generate_password(size=12, chars=string.ascii_letters + string.digits):
@@ -24,6 +69,14 @@ def nested_set(dic, keys, value):
     dic[keys[-1]] = value
 
 
+def nested_has(dic, keys):
+    for key in keys:
+        if not isinstance(dic, dict) or key not in dic:
+            return False
+        dic = dic[key]
+    return True
+
+
 def create_configs_dir():
     if not os.path.isdir("/lto/configs"):
         os.mkdir("/lto/configs")
@@ -42,6 +95,8 @@ def parse_env_variables():
 
 
 def get_wallet_data():
+    import base58
+
     seed = os.environ.get('LTO_WALLET_SEED')
     seed_base58 = os.environ.get('LTO_WALLET_SEED_BASE58')
     if seed_base58 is not None:
@@ -54,6 +109,7 @@ def get_wallet_data():
             if NETWORK == 'CUSTOM':
                 seed = 'root'
             else:
+                import pywaves as pw
                 seed = pw.Address().seed
                 
             print('Seed phrase:', seed)
@@ -65,12 +121,57 @@ def get_wallet_data():
 
 
 def secureHash(message):
+    import base58
+    from pyblake2 import blake2b
+
     h = blake2b(digest_size=32)
     h.update(message.encode())
     return base58.b58encode(sha256(h.digest()).digest())
 
 
-def create_fee_vote_cron():
+def find_block_export():
+    """
+    Block export (created with com.ltonetwork.Exporter) to import on the first start: LTO_IMPORT_FILE or else the most
+    recent file in /lto/import. Only used while the data directory is still empty.
+    """
+    if os.listdir('/lto/data'):
+        return None
+
+    path = os.environ.get('LTO_IMPORT_FILE')
+    if path:
+        return path if os.path.isfile(path) else None
+
+    if not os.path.isdir(IMPORT_DIR):
+        return None
+    files = [os.path.join(IMPORT_DIR, name) for name in os.listdir(IMPORT_DIR)]
+    files = [path for path in files if os.path.isfile(path)]
+    return max(files, key=os.path.getmtime) if files else None
+
+
+def import_blocks(path, options):
+    # The importer logs its progress and throughput to stdout
+    command = [os.path.join(os.environ.get('JAVA_HOME', '/usr'), 'bin', 'java'),
+               '-Dlogback.stdout.level=%s' % os.environ.get('LTO_LOG_LEVEL', 'INFO')]
+    command += options + os.environ.get('LTO_JAVA_OPTS', '').split()
+    command += ['-cp', '/lto-node/lto-public-all.jar', 'com.ltonetwork.Importer', '/lto/configs/lto-config.conf', path]
+
+    trusted_height = os.environ.get('LTO_IMPORT_TRUSTED_HEIGHT')
+    if trusted_height:
+        command.append(trusted_height)
+
+    size = os.path.getsize(path)
+    print('Importing blocks from %s (%d MiB)' % (path, size // MIB), flush=True)
+    start = monotonic()
+    result = subprocess.run(command)
+    duration = monotonic() - start
+
+    if result.returncode != 0:
+        print('Import failed with exit code %d, the node will sync from its peers' % result.returncode)
+    else:
+        print('Import finished in %.0fs, %.1f MiB/s' % (duration, size / MIB / max(duration, 0.001)))
+
+
+def start_fee_vote_daemon():
     if ENABLE_REST_API.lower() in TRUEISH:
         node = 'http://localhost:6869'
     elif NETWORK == 'MAINNET':
@@ -80,25 +181,189 @@ def create_fee_vote_cron():
     else:
         return
 
-    with open('/etc/cron.d/fee-vote', 'w') as f:
-        f.write('*/10 * * * *  root  /usr/bin/python3 /lto-node/fee-vote.py %s %s\n' % (node, '/lto/fee-vote'))
-    os.chmod('/etc/cron.d/fee-vote', 0o644)
-    os.system('service cron start')
-
-
-if __name__ == "__main__":
-    NETWORK = os.environ.get('LTO_NETWORK')
-    if NETWORK is None or NETWORK not in ['MAINNET', 'TESTNET', 'CUSTOM']:
-        NETWORK = 'MAINNET'
-
-    create_configs_dir()
-
-    if NETWORK == 'MAINNET':
-        copyfile('/lto-node/lto-mainnet.conf', '/lto/configs/lto-config.conf')
-    elif NETWORK == 'TESTNET':
-        copyfile('/lto-node/lto-testnet.conf', '/lto/configs/lto-config.conf')
-    elif NETWORK == 'CUSTOM':
-        copyfile('/lto-node/lto-custom.conf', '/lto/configs/lto-config.conf')
+    # Keeps running in the background after the starter exits; its output goes to the container log
+    subprocess.Popen(['/usr/bin/python3', '-u', '/lto-node/fee-vote.py', '--daemon', node, '/lto/fee-vote'],
+                     start_new_session=True)
+
+
+def read_first_line(path):
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def cgroup_limits(root=CGROUP_ROOT):
+    """
+    CPU and memory limits of the container, from cgroup v2 or else cgroup v1. Without a limit, the CPUs and memory of
+    the host are used.
+    """
+    cpus = memory = None
+    source = 'host'
+
+    cpu_max = read_first_line(os.path.join(root, 'cpu.max'))  # cgroup v2: "<quota> <period>" or "max <period>"
+    memory_max = read_first_line(os.path.join(root, 'memory.max'))
+    if cpu_max is not None or memory_max is not None:
+        source = 'cgroup v2'
+        if cpu_max and not cpu_max.startswith('max'):
+            quota, period = cpu_max.split()
+            cpus = int(quota) / int(period)
+        if memory_max and memory_max != 'max':
+            memory = int(memory_max)
+    else:
+        quota = read_first_line(os.path.join(root, 'cpu', 'cpu.cfs_quota_us'))
+        period = read_first_line(os.path.join(root, 'cpu', 'cpu.cfs_period_us'))
+        limit = read_first_line(os.path.join(root, 'memory', 'memory.limit_in_bytes'))
+        if quota is not None or limit is not None:
+            source = 'cgroup v1'
+        if quota and period and int(quota) > 0:
+            cpus = int(quota) / int(period)
+        if limit and int(limit) < UNLIMITED_MEMORY:
+            memory = int(limit)
+
+    host_cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    host_memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+
+    return {
+        'cpus': max(1, min(int(cpus + 0.5) if cpus else host_cpus, host_cpus)),
+        'memory': min(memory or host_memory, host_memory),
+        'source': source,
+    }
+
+
+def parse_size_mib(size):
+    """Size in the -Xmx notation of the JVM (bytes, or a number with a k, m, g or t suffix) in MiB."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([kmgt]?)', size.strip().lower())
+    if not match:
+        raise ValueError('Invalid size %r, expected a number with an optional k, m, g or t suffix' % size)
+
+    units = {'': 1 / MIB, 'k': 1 / 1024, 'm': 1, 'g': 1024, 't': 1024 * 1024}
+    return int(float(match.group(1)) * units[match.group(2)])
+
+
+def heap_size_mib(resources):
+    heap = os.environ.get('LTO_HEAP_SIZE')
+    if heap:
+        heap_mib = parse_size_mib(heap)
+        if heap_mib < 1:
+            raise ValueError('LTO_HEAP_SIZE %s is less than 1 MiB' % heap)
+        return min(heap_mib, MAX_HEAP_MIB)
+
+    # Leave the rest of the memory for LevelDB, direct buffers and the OS
+    memory_mib = resources['memory'] // MIB
+    return max(512, min(memory_mib // 2, memory_mib - 1024, MAX_HEAP_MIB))
+
+
+def gc_options(gc):
+    """JVM options for LTO_GC: the name of a collector (G1, Serial, Parallel, ZGC or Shenandoah) or -XX: options."""
+    if gc.startswith('-XX:'):
+        return gc.split()
+
+    name = gc.lower()
+    name = name[:-2] if name.endswith('gc') and name[:-2] in GC_OPTIONS else name
+    if name not in GC_OPTIONS:
+        raise ValueError('Unknown LTO_GC %s, use one of G1, Serial, Parallel, ZGC, Shenandoah or -XX: options' % gc)
+    return GC_OPTIONS[name]
+
+
+def jvm_options(resources):
+    """
+    Heap size and GC for the available memory and CPUs. LTO_HEAP_SIZE and LTO_GC override them; LTO_JAVA_OPTS is added
+    to the command line after these options, so it overrides anything else. Raises a ValueError for an invalid
+    LTO_HEAP_SIZE or LTO_GC.
+    """
+    heap_mib = heap_size_mib(resources)
+    gc = os.environ.get('LTO_GC', 'G1' if resources['cpus'] >= 2 and heap_mib >= 1792 else 'Serial')
+
+    options = ['-Xmx%dm' % heap_mib]
+    options += gc_options(gc)
+    options += [
+        '-XX:ActiveProcessorCount=%d' % resources['cpus'],
+        '-XX:+ExitOnOutOfMemoryError',
+    ]
+    if '-XX:+UseG1GC' in options:
+        options += ['-XX:MaxGCPauseMillis=200', '-XX:ParallelGCThreads=%d' % resources['cpus']]
+
+    return options
+
+
+def node_tuning(resources, profile):
+    """
+    Node settings that scale with the heap and the number of CPUs: the sizes of the state caches and the UTX pool, and
+    the threads of the REST API. The defaults of the node are tuned for a 2g heap. The profile adds its own settings and
+    scales the derived ones.
+    """
+    scale = profile['scale'] if profile else DEFAULT_SCALE
+    entries = min(max(heap_size_mib(resources) * 50, 10000), 500000)
+    threads = max(8, resources['cpus'] * 3)
+
+    return (profile['settings'] if profile else []) + [
+        (['lto', 'max-cache-size'], int(entries * scale['cache'])),
+        (['lto', 'utx', 'max-size'], int(entries * scale['utx'])),
+        (['akka', 'actor', 'default-dispatcher', 'fork-join-executor', 'parallelism-max'], threads * scale['threads']),
+    ]
+
+
+def apply_tuning(env_dict, resources, profile):
+    """Add the settings of the profile and the tuned values. Settings from environment variables win over both."""
+    for keys, value in node_tuning(resources, profile):
+        if nested_has(env_dict, keys):
+            print('Node setting: %s from environment' % '.'.join(keys))
+        else:
+            nested_set(env_dict, keys, value)
+            print('Node setting: %s = %s' % ('.'.join(keys), value))
+
+
+def get_profile():
+    name = os.environ.get('LTO_PROFILE', '').lower()
+    if not name:
+        return None
+    if name not in PROFILES:
+        print('Unknown profile %s, available profiles are %s' % (name, ', '.join(PROFILES)))
+        return None
+
+    print('Profile %s: %s' % (name, PROFILES[name]['description']))
+    return PROFILES[name]
+
+
+def redacted(dic):
+    """Copy of the config without the wallet seed and password, for printing."""
+    wallet = dict(dic.get('lto', {}).get('wallet', {}), seed='***', password='***')
+    return dict(dic, lto=dict(dic.get('lto', {}), wallet=wallet))
+
+
+def env_hash(network_config, resources):
+    """
+    Hash of everything that determines the rendered configuration: the environment variables of the node, the limits
+    of the container, the network configuration of the image and this script.
+    """
+    h = sha256()
+    h.update(('%d cpus, %d bytes\n' % (resources['cpus'], resources['memory'])).encode())
+    for key in sorted(os.environ):
+        if key.startswith('LTO_') or '__' in key:
+            h.update(('%s=%s\n' % (key, os.environ[key])).encode())
+    for path in (network_config, __file__):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def is_rendered(hash):
+    if not os.path.isfile('/lto/configs/local.conf') or not os.path.isfile('/lto/configs/lto-config.conf'):
+        return False
+    try:
+        with open(HASH_FILE) as f:
+            return f.read() == hash
+    except OSError:
+        return False
+
+
+def render_config(network_config, resources, profile):
+    """Write the local config of the node. Returns False if the existing config is kept."""
+    from pyhocon import ConfigFactory, HOCONConverter
+
+    copyfile(network_config, '/lto/configs/lto-config.conf')
 
     api_key = os.environ.get('LTO_API_KEY', generate_password())
     if not os.environ.get('LTO_API_KEY'):
@@ -114,7 +379,7 @@ if __name__ == "__main__":
         conf = ConfigFactory.parse_file(confFilePath)
         if conf.get('lto.wallet.seed') != lto_data[0] or conf.get('lto.wallet.password') != lto_data[1]:
             print('The wallet seed or password has changed. You will need create a new container to change the configuration.')
-            sys.exit(0)
+            return False
 
     nested_set(env_dict, ['lto', 'directory'], '/lto')
     nested_set(env_dict, ['lto', 'data-directory'], '/lto/data')
@@ -122,12 +387,13 @@ if __name__ == "__main__":
     nested_set(env_dict, ['lto', 'wallet', 'password'], lto_data[1])
     nested_set(env_dict, ['lto', 'rest-api', 'api-key-hash'], api_key_hash)
 
-    ENABLE_REST_API = os.environ.get('LTO_ENABLE_REST_API', 'no' if NETWORK == 'MAINNET' else 'yes')
     if ENABLE_REST_API.lower() in TRUEISH:
         nested_set(env_dict, ['lto', 'rest-api', 'enable'], 'yes')
         nested_set(env_dict, ['lto', 'rest-api', 'bind-address'], '0.0.0.0')
+    elif not nested_has(env_dict, ['lto', 'rest-api', 'enable']):
+        nested_set(env_dict, ['lto', 'rest-api', 'enable'], 'no')  # The testnet config enables it
 
-    ENABLE_MINING = os.environ.get('LTO_ENABLE_MINING', 'yes')
+    ENABLE_MINING = os.environ.get('LTO_ENABLE_MINING', profile['mining'] if profile else 'yes')
     nested_set(env_dict, ['lto', 'miner', 'enable'], 'yes' if ENABLE_MINING.lower() in TRUEISH else 'no')
 
     LTO_NODE_NAME = os.getenv('LTO_NODE_NAME')
@@ -142,9 +408,65 @@ if __name__ == "__main__":
     if LTO_FEATURES:
         nested_set(env_dict, ['lto', 'features', 'supported'], LTO_FEATURES.split(','))
 
+    apply_tuning(env_dict, resources, profile)
+
     config = ConfigFactory.from_dict(env_dict)
     local_conf = HOCONConverter.convert(config, 'hocon')
     with open(confFilePath, 'w') as file:
         file.write(local_conf)
 
-    create_fee_vote_cron()
+    print('Configuration (%s):' % confFilePath)
+    print(HOCONConverter.convert(ConfigFactory.from_dict(redacted(env_dict)), 'hocon'))
+    return True
+
+
+if __name__ == "__main__":
+    phases = [('start', monotonic())]
+
+    NETWORK = os.environ.get('LTO_NETWORK')
+    if NETWORK is None or NETWORK not in ['MAINNET', 'TESTNET', 'CUSTOM']:
+        NETWORK = 'MAINNET'
+
+    profile = get_profile()
+    ENABLE_REST_API = os.environ.get('LTO_ENABLE_REST_API', profile['rest-api'] if profile else
+                                     'no' if NETWORK == 'MAINNET' else 'yes')
+
+    create_configs_dir()
+    network_config = '/lto-node/lto-%s.conf' % NETWORK.lower()
+
+    resources = cgroup_limits()
+    try:
+        options = jvm_options(resources)
+    except ValueError as e:
+        sys.exit('Unable to start the node: %s' % e)  # entrypoint.sh stops, instead of using the last JVM options
+    with open(JVM_OPTIONS_FILE, 'w') as f:
+        f.write(' '.join(options))
+    print('Resources: %d CPUs, %d MiB memory (%s)' % (resources['cpus'], resources['memory'] // MIB, resources['source']))
+    print('JVM options: %s' % ' '.join(options + os.environ.get('LTO_JAVA_OPTS', '').split()))
+    phases.append(('resources', monotonic()))
+
+    # Nothing to render if the environment is the same as the last time the container started
+    hash = env_hash(network_config, resources)
+    phases.append(('hash', monotonic()))
+    if is_rendered(hash):
+        print('Configuration unchanged, skipping rendering')
+        phases.append(('render (skipped)', monotonic()))
+    elif render_config(network_config, resources, profile):
+        with open(HASH_FILE, 'w') as f:
+            f.write(hash)
+        phases.append(('render', monotonic()))
+    else:
+        phases.append(('render (kept)', monotonic()))
+
+    export = find_block_export()
+    if export:
+        import_blocks(export, options)
+        phases.append(('import', monotonic()))
+
+    start_fee_vote_daemon()
+    phases.append(('fee vote', monotonic()))
+
+    print('Startup timing: %s, total %.2fs' % (
+        ', '.join('%s %.2fs' % (name, end - begin) for (_, begin), (name, end) in zip(phases, phases[1:])),
+        phases[-1][1] - phases[0][1]
+    ))
@@ -0,0 +1,12 @@
+import importlib.util
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def load_script(filename, name):
+    """The scripts of the docker image aren't modules (fee-vote.py can't even be imported by name)."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
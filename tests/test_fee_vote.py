@@ -0,0 +1,126 @@
+import json
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from conftest import load_script
+
+fee_vote = load_script('fee-vote.py', 'fee_vote')
+
+
+def resolved(result=None, error=None):
+    future = Future()
+    if error:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+@pytest.fixture
+def providers(monkeypatch, tmp_path):
+    """Replaces the requests with the (delay, price or error) per provider."""
+    answers = {'node': (0, 1000), 'coingecko': (0, 0.1), 'coinmarketcap': (0, 0.1)}
+
+    def answer(provider):
+        def fetch(*args):
+            delay, result = answers[provider]
+            time.sleep(delay)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return fetch
+
+    monkeypatch.setattr(fee_vote, 'fetch_price', answer('node'))
+    monkeypatch.setattr(fee_vote, 'coingecko_price', answer('coingecko'))
+    monkeypatch.setattr(fee_vote, 'coinmarketcap_price', answer('coinmarketcap'))
+    monkeypatch.setattr(fee_vote, 'TIMEOUT', 0.5)
+    monkeypatch.setenv('COINMARKETCAP_API_KEY', 'key')
+    monkeypatch.setenv('LTO_FEE_PRICE_CACHE', str(tmp_path / 'price.json'))
+    return answers
+
+
+def test_request_timeout_ends_at_the_deadline():
+    connect, read = fee_vote.request_timeout(time.monotonic() + 4)
+
+    assert connect + read == pytest.approx(4, abs=0.01)
+    assert fee_vote.request_timeout(time.monotonic() - 1) == (0.05, 0.05)
+
+
+def test_cached_price():
+    cache = {'coingecko': {'price': 0.1, 'time': time.time() - 100}}
+
+    assert fee_vote.cached_price(cache, 'coingecko', 200) == 0.1
+    assert fee_vote.cached_price(cache, 'coingecko', 50) is None
+    assert fee_vote.cached_price(cache, 'coinmarketcap', 200) is None
+
+
+def test_collect_a_fetched_price():
+    cache = {}
+
+    assert fee_vote.collect_price(cache, 'coingecko', resolved(0.2)) == 0.2
+    assert cache['coingecko']['price'] == 0.2
+
+
+def test_collect_an_expired_price_when_fetching_fails():
+    cache = {'coingecko': {'price': 0.1, 'time': time.time() - fee_vote.PRICE_TTL - 1}}
+
+    assert fee_vote.collect_price(cache, 'coingecko', resolved(error=ValueError('bad json'))) == 0.1
+    assert fee_vote.collect_price(cache, 'coingecko', Future()) == 0.1
+
+
+def test_collect_fails_without_a_cached_price():
+    with pytest.raises(Exception, match='coingecko: timeout'):
+        fee_vote.collect_price({}, 'coingecko', Future())
+
+
+@pytest.mark.parametrize('target, current, vote', [(800, 1000, 'decrease'), (950, 1000, 'maintain'),
+                                                   (1200, 1000, 'increase')])
+def test_determine_vote(target, current, vote):
+    assert fee_vote.determine_vote(target, current) == vote
+
+
+def test_evaluate(providers, tmp_path):
+    assert fee_vote.evaluate('http://node', str(tmp_path / 'vote')) == 'increase'  # 20000 / 0.1 is more than 1000
+
+    cache = json.loads((tmp_path / 'price.json').read_text())
+    assert cache['coingecko']['price'] == cache['coinmarketcap']['price'] == 0.1
+
+
+def test_evaluate_keeps_to_the_budget_when_a_provider_trickles(providers, tmp_path):
+    providers['coinmarketcap'] = (5, 0.1)
+    start = time.monotonic()
+
+    with pytest.raises(Exception, match='coinmarketcap: timeout'):
+        fee_vote.evaluate('http://node', str(tmp_path / 'vote'))
+    assert time.monotonic() - start < 1
+
+
+def test_evaluate_caches_the_price_of_a_provider_when_the_other_fails(providers, tmp_path):
+    providers['coinmarketcap'] = (0, ValueError('bad json'))
+
+    with pytest.raises(Exception, match='coinmarketcap'):
+        fee_vote.evaluate('http://node', str(tmp_path / 'vote'))
+
+    cache = json.loads((tmp_path / 'price.json').read_text())
+    assert cache['coingecko']['price'] == 0.1
+    assert 'coinmarketcap' not in cache
+
+
+def test_evaluate_doesnt_fetch_a_fresh_price(providers, tmp_path):
+    fee_vote.write_cache(str(tmp_path / 'price.json'), {
+        'coingecko': {'price': 0.1, 'time': time.time()}, 'coinmarketcap': {'price': 0.1, 'time': time.time()},
+    })
+    providers['coingecko'] = providers['coinmarketcap'] = (0, ValueError('not fetched'))
+
+    assert fee_vote.evaluate('http://node', str(tmp_path / 'vote')) == 'increase'
+
+
+@pytest.mark.parametrize('height, moment', [
+    (1000, (1, False)), (1989, (1, False)), (1990, (1, True)), (1999, (1, True)), (2000, (2, False)),
+])
+def test_vote_moment(monkeypatch, height, moment):
+    monkeypatch.setattr(fee_vote, 'PERIOD_MARGIN', 10)
+
+    assert fee_vote.vote_moment(height, 1000) == moment
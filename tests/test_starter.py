@@ -0,0 +1,211 @@
+import pytest
+
+from conftest import load_script
+
+starter = load_script('starter.py', 'starter')
+
+GIB = 1024 * starter.MIB
+HOST = {'cpus': 8, 'memory': 64 * GIB}
+
+
+@pytest.fixture(autouse=True)
+def host(monkeypatch):
+    monkeypatch.setattr(starter.os, 'sched_getaffinity', lambda pid: set(range(HOST['cpus'])), raising=False)
+    pages = {'SC_PAGE_SIZE': 4096, 'SC_PHYS_PAGES': HOST['memory'] // 4096}
+    monkeypatch.setattr(starter.os, 'sysconf', lambda name: pages[name])
+    for key in ('LTO_HEAP_SIZE', 'LTO_GC'):
+        monkeypatch.delenv(key, raising=False)
+
+
+def write(root, path, content):
+    file = root / path
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(content + '\n')
+
+
+def test_cgroup_v2_limits(tmp_path):
+    write(tmp_path, 'cpu.max', '150000 100000')
+    write(tmp_path, 'memory.max', str(3 * GIB))
+
+    assert starter.cgroup_limits(str(tmp_path)) == {'cpus': 2, 'memory': 3 * GIB, 'source': 'cgroup v2'}
+
+
+def test_cgroup_v2_without_limits(tmp_path):
+    write(tmp_path, 'cpu.max', 'max 100000')
+    write(tmp_path, 'memory.max', 'max')
+
+    assert starter.cgroup_limits(str(tmp_path)) == dict(HOST, source='cgroup v2')
+
+
+def test_cgroup_v1_limits(tmp_path):
+    write(tmp_path, 'cpu/cpu.cfs_quota_us', '400000')
+    write(tmp_path, 'cpu/cpu.cfs_period_us', '100000')
+    write(tmp_path, 'memory/memory.limit_in_bytes', str(6 * GIB))
+
+    assert starter.cgroup_limits(str(tmp_path)) == {'cpus': 4, 'memory': 6 * GIB, 'source': 'cgroup v1'}
+
+
+def test_cgroup_v1_without_limits(tmp_path):
+    write(tmp_path, 'cpu/cpu.cfs_quota_us', '-1')
+    write(tmp_path, 'cpu/cpu.cfs_period_us', '100000')
+    write(tmp_path, 'memory/memory.limit_in_bytes', '9223372036854771712')
+
+    assert starter.cgroup_limits(str(tmp_path)) == dict(HOST, source='cgroup v1')
+
+
+def test_limits_above_the_host_are_capped(tmp_path):
+    write(tmp_path, 'cpu.max', '3200000 100000')
+    write(tmp_path, 'memory.max', str(128 * GIB))
+
+    assert starter.cgroup_limits(str(tmp_path)) == dict(HOST, source='cgroup v2')
+
+
+def test_no_cgroup(tmp_path):
+    assert starter.cgroup_limits(str(tmp_path)) == dict(HOST, source='host')
+
+
+@pytest.mark.parametrize('memory_gib, heap_mib', [(1, 512), (2, 1024), (3, 1536), (8, 4096), (128, 31 * 1024)])
+def test_derived_heap_size(memory_gib, heap_mib):
+    assert starter.heap_size_mib({'cpus': 2, 'memory': memory_gib * GIB}) == heap_mib
+
+
+@pytest.mark.parametrize('size, heap_mib', [
+    ('2g', 2048), ('1536m', 1536), ('1.5G', 1536), ('524288k', 512), (str(GIB), 1024), ('64g', 31 * 1024),
+])
+def test_heap_size_from_the_environment(monkeypatch, size, heap_mib):
+    monkeypatch.setenv('LTO_HEAP_SIZE', size)
+
+    assert starter.heap_size_mib(HOST) == heap_mib
+
+
+@pytest.mark.parametrize('size', ['2gb', 'g', '-1g', '2 g', '100'])
+def test_invalid_heap_size(monkeypatch, size):
+    monkeypatch.setenv('LTO_HEAP_SIZE', size)
+
+    with pytest.raises(ValueError):
+        starter.heap_size_mib(HOST)
+
+
+def test_jvm_options():
+    options = starter.jvm_options({'cpus': 4, 'memory': 8 * GIB})
+
+    assert options == ['-Xmx4096m', '-XX:+UseG1GC', '-XX:ActiveProcessorCount=4', '-XX:+ExitOnOutOfMemoryError',
+                       '-XX:MaxGCPauseMillis=200', '-XX:ParallelGCThreads=4']
+
+
+def test_jvm_options_of_a_small_container():
+    options = starter.jvm_options({'cpus': 1, 'memory': 2 * GIB})
+
+    assert options == ['-Xmx1024m', '-XX:+UseSerialGC', '-XX:ActiveProcessorCount=1', '-XX:+ExitOnOutOfMemoryError']
+
+
+@pytest.mark.parametrize('gc, options', [
+    ('G1', ['-XX:+UseG1GC']),
+    ('parallel', ['-XX:+UseParallelGC']),
+    ('ZGC', ['-XX:+UnlockExperimentalVMOptions', '-XX:+UseZGC']),
+    ('Shenandoah', ['-XX:+UnlockExperimentalVMOptions', '-XX:+UseShenandoahGC']),
+    ('-XX:+UseEpsilonGC -XX:+UnlockExperimentalVMOptions', ['-XX:+UseEpsilonGC', '-XX:+UnlockExperimentalVMOptions']),
+])
+def test_gc_options(gc, options):
+    assert starter.gc_options(gc) == options
+
+
+def test_unknown_gc(monkeypatch):
+    monkeypatch.setenv('LTO_GC', 'Z1')
+
+    with pytest.raises(ValueError, match='Unknown LTO_GC'):
+        starter.jvm_options(HOST)
+
+
+@pytest.fixture
+def network_config(tmp_path):
+    path = tmp_path / 'lto-mainnet.conf'
+    path.write_text('lto { blockchain.type = MAINNET }')
+    return str(path)
+
+
+def test_env_hash_is_stable(monkeypatch, network_config):
+    monkeypatch.setenv('LTO_NODE_NAME', 'node')
+
+    assert starter.env_hash(network_config, HOST) == starter.env_hash(network_config, dict(HOST))
+
+
+@pytest.mark.parametrize('change', [
+    lambda monkeypatch, path: monkeypatch.setenv('LTO_NODE_NAME', 'other'),
+    lambda monkeypatch, path: monkeypatch.setenv('LTO_WALLET_SEED', 'seed'),
+    lambda monkeypatch, path: monkeypatch.setenv('LTO__UTX__MAX_SIZE', '1000'),
+    lambda monkeypatch, path: open(path, 'a').write('\n# changed'),
+])
+def test_env_hash_changes_with_the_node_environment(monkeypatch, network_config, change):
+    monkeypatch.setenv('LTO_NODE_NAME', 'node')
+    before = starter.env_hash(network_config, HOST)
+
+    change(monkeypatch, network_config)
+
+    assert starter.env_hash(network_config, HOST) != before
+
+
+def test_env_hash_changes_with_the_resources(network_config):
+    assert starter.env_hash(network_config, HOST) != starter.env_hash(network_config, dict(HOST, cpus=2))
+    assert starter.env_hash(network_config, HOST) != starter.env_hash(network_config, dict(HOST, memory=GIB))
+
+
+def test_env_hash_ignores_other_variables(monkeypatch, network_config):
+    before = starter.env_hash(network_config, HOST)
+
+    monkeypatch.setenv('HOSTNAME', 'container')
+    monkeypatch.setenv('JAVA_HOME', '/usr/lib/jvm')
+
+    assert starter.env_hash(network_config, HOST) == before
+
+
+def test_redacted_hides_the_wallet():
+    config = {'lto': {'wallet': {'seed': 'secret', 'password': 'secret', 'file': 'wallet.dat'}, 'directory': '/lto'}}
+
+    assert starter.redacted(config) == {
+        'lto': {'wallet': {'seed': '***', 'password': '***', 'file': 'wallet.dat'}, 'directory': '/lto'}
+    }
+    assert config['lto']['wallet']['seed'] == 'secret'
+
+
+@pytest.mark.parametrize('name, profile', [('validator', 'validator'), ('Gateway', 'gateway'), ('', None),
+                                           ('miner', None)])
+def test_get_profile(monkeypatch, name, profile):
+    monkeypatch.setenv('LTO_PROFILE', name)
+
+    assert starter.get_profile() == starter.PROFILES.get(profile)
+
+
+def tuning(profile=None, resources=None):
+    return dict((tuple(keys), value) for keys, value in starter.node_tuning(resources or HOST, profile))
+
+
+def test_node_tuning_without_a_profile():
+    settings = tuning()
+
+    assert settings[('lto', 'max-cache-size')] == settings[('lto', 'utx', 'max-size')] == 500000
+    assert settings[('akka', 'actor', 'default-dispatcher', 'fork-join-executor', 'parallelism-max')] == 24
+
+
+def test_node_tuning_scales_with_the_profile():
+    resources = {'cpus': 2, 'memory': 2 * GIB}
+    default = tuning(resources=resources)
+    validator = tuning(starter.PROFILES['validator'], resources)
+    archive = tuning(starter.PROFILES['archive'], resources)
+
+    assert validator[('lto', 'utx', 'max-size')] == default[('lto', 'utx', 'max-size')] // 4
+    assert validator[('lto', 'utx', 'max-transaction-age')] == '30m'
+    assert archive[('lto', 'max-cache-size')] == default[('lto', 'max-cache-size')] * 4
+    assert archive[('lto', 'index-all-transactions')] == 'yes'
+
+
+def test_environment_wins_over_the_profile(monkeypatch):
+    monkeypatch.setenv('LTO__UTX__MAX_SIZE', '1000')
+    monkeypatch.setenv('LTO__INDEX_ALL_TRANSACTIONS', 'no')
+    env_dict = starter.parse_env_variables()
+
+    starter.apply_tuning(env_dict, HOST, starter.PROFILES['archive'])
+
+    assert env_dict['lto']['utx'] == {'max-size': '1000'}
+    assert env_dict['lto']['index-all-transactions'] == 'no'
+    assert env_dict['lto']['max-cache-size'] == 500000 * 4